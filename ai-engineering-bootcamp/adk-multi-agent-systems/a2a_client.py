@@ -0,0 +1,295 @@
+"""
+Shared A2A client layer for calling remote agents (the shipping agent) from many agents and reruns.
+A2AClientPool keeps, per remote host:
+- one keep-alive httpx client, so hops reuse an open connection instead of connecting each time
+- a circuit breaker on that client's transport: after `failure_threshold` consecutive failures (errors, timeouts, 5xx)
+  calls fail immediately for `reset_timeout` seconds instead of each waiting for the timeout, then one trial call
+  decides whether to close the circuit again
+- retries of 429 responses (a scaled agent's full queue, see a2a_service.py) after their Retry-After
+- a cache of the agent card, reused for `card_ttl` seconds and then revalidated with If-None-Match,
+  so an unchanged card costs a 304 instead of a download
+
+A2AClientPool.remote_agent builds a RemoteA2aAgent on the pool's client for that host, passing the cached card in
+pre-resolved when there is one (await pool.card(url) first to make sure of it). The server side of the card cache,
+ETag/304 support, is AgentCardETagMiddleware in a2a_service.py.
+
+Benchmark cold vs warm A2A round trips against a local `to_a2a` server with a stub model (no API key needed):
+    python a2a_client.py --calls 20
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+from a2a.types import AgentCard
+from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
+
+try:
+    from a2a.client.card_resolver import parse_agent_card
+except ImportError:  # a2a-sdk 0.x: AgentCard is a pydantic model
+    parse_agent_card = AgentCard.model_validate
+
+CARD_PATH = "/.well-known/agent-card.json"
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of calling a remote agent that keeps failing."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False  # half-open lets exactly one call through to probe the remote
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half-open" and self.trial_in_flight):
+            self.stats["rejected"] += 1
+            if state == "open":
+                raise CircuitOpenError(f"circuit open after {self.failures} failures; retry in {self.retry_after():.0f}s")
+            raise CircuitOpenError("circuit half-open; waiting for the trial call to the remote agent")
+        if state == "half-open":
+            self.trial_in_flight = True
+        self.stats["calls"] += 1
+
+    def abandon(self):
+        """A call ended without an outcome (e.g. cancelled); let the next caller make the trial call instead."""
+        self.trial_in_flight = False
+
+    def retry_after(self) -> float:
+        return 0.0 if self.opened_at is None else max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record(self, ok: bool):
+        self.trial_in_flight = False
+        if ok:
+            self.failures, self.opened_at = 0, None
+            return
+        self.failures += 1
+        self.stats["failures"] += 1
+        if self.state == "half-open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()  # (re)open: the trial call failed or the threshold was reached
+            self.stats["opened"] += 1
+
+
+class BreakerTransport(httpx.AsyncBaseTransport):
+    """httpx transport that counts outcomes on a CircuitBreaker and short-circuits while it is open.
+    A 429 (the server's queue is full) is retried after its Retry-After, if that is at most `max_retry_wait` seconds."""
+
+    def __init__(self, breaker: CircuitBreaker, transport: httpx.AsyncBaseTransport, retries_on_429: int = 2,
+                 max_retry_wait: float = 10.0):
+        self.breaker = breaker
+        self.transport = transport
+        self.retries_on_429 = retries_on_429
+        self.max_retry_wait = max_retry_wait
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self.retries_on_429 + 1):
+            self.breaker.before_call()
+            try:
+                response = await self.transport.handle_async_request(request)
+            except Exception:
+                self.breaker.record(ok=False)
+                raise
+            except BaseException:  # cancelled: no verdict on the remote
+                self.breaker.abandon()
+                raise
+            self.breaker.record(ok=response.status_code < 500)  # back-pressure is not a failure
+            if response.status_code != 429 or attempt == self.retries_on_429:
+                return response
+            try:
+                delay = float(response.headers.get("retry-after", "1"))
+            except ValueError:
+                delay = 1.0
+            if delay > self.max_retry_wait:
+                return response
+            await response.aclose()
+            await asyncio.sleep(delay)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class A2AClientPool:
+    """Per-host keep-alive clients, circuit breakers and agent-card cache for A2A calls."""
+
+    def __init__(self, card_ttl: float = 300.0, timeout: float = 60.0, connect_timeout: float = 2.0,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.card_ttl = card_ttl
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clients = {}  # origin -> httpx.AsyncClient
+        self.breakers = {}  # origin -> CircuitBreaker
+        self._cards = {}  # card url -> (AgentCard, etag, fetched_at)
+        self.stats = {"card_hits": 0, "card_revalidated": 0, "card_fetches": 0}
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def client(self, url: str) -> httpx.AsyncClient:
+        origin = self._origin(url)
+        if origin not in self._clients:
+            breaker = self.breakers[origin] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+            )
+            self._clients[origin] = httpx.AsyncClient(
+                transport=BreakerTransport(breaker, transport), timeout=self.timeout
+            )
+        return self._clients[origin]
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        self.client(url)
+        return self.breakers[self._origin(url)]
+
+    @staticmethod
+    def _card_url(url: str) -> str:
+        return url if url.endswith(".json") else url.rstrip("/") + CARD_PATH
+
+    async def card(self, url: str) -> AgentCard:
+        """The agent card for a base URL (or a full card URL), fetched at most once per TTL."""
+        card_url = self._card_url(url)
+        cached = self._cards.get(card_url)
+        if cached and time.monotonic() - cached[2] < self.card_ttl:
+            self.stats["card_hits"] += 1
+            return cached[0]
+        headers = {"If-None-Match": cached[1]} if cached and cached[1] else {}
+        response = await self.client(card_url).get(card_url, headers=headers)
+        if response.status_code == 304 and cached:
+            self.stats["card_revalidated"] += 1
+            card, etag = cached[0], cached[1]
+        else:
+            response.raise_for_status()
+            self.stats["card_fetches"] += 1
+            card, etag = parse_agent_card(response.json()), response.headers.get("etag")
+        self._cards[card_url] = (card, etag, time.monotonic())
+        return card
+
+    def remote_agent(self, name: str, url: str, description: str = "", **kwargs) -> RemoteA2aAgent:
+        """RemoteA2aAgent on this host's pooled client. A card cached within the TTL is passed in pre-resolved;
+        otherwise the agent fetches the card itself, over the same keep-alive client."""
+        cached = self._cards.get(self._card_url(url))
+        fresh = cached is not None and time.monotonic() - cached[2] < self.card_ttl
+        return RemoteA2aAgent(
+            name=name, agent_card=cached[0] if fresh else url, description=description,
+            httpx_client=self.client(url), **kwargs
+        )
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+def create_a2a_pool() -> A2AClientPool:
+    """Build from A2A_CARD_TTL_SECONDS (300), A2A_TIMEOUT_SECONDS (60) and A2A_BREAKER_FAILURES (3)."""
+    return A2AClientPool(
+        card_ttl=float(os.getenv("A2A_CARD_TTL_SECONDS", "300")),
+        timeout=float(os.getenv("A2A_TIMEOUT_SECONDS", "60")),
+        failure_threshold=int(os.getenv("A2A_BREAKER_FAILURES", "3")),
+    )
+
+
+# --- Cold vs warm benchmark ---
+
+def _stub_app(port: int):
+    """A to_a2a server around a shipping agent whose model answers instantly."""
+    from google.adk.a2a.utils.agent_to_a2a import to_a2a
+    from google.adk.agents import Agent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai import types
+
+    class StubLlm(BaseLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text="ORD-1004 is out for delivery.")]),
+                usage_metadata=types.GenerateContentResponseUsageMetadata(prompt_token_count=1, candidates_token_count=1),
+            )
+
+    agent = Agent(name="shipping_status_agent", model=StubLlm(model="stub"), description="Shipping questions.")
+    from a2a_service import AgentCardETagMiddleware
+
+    app = to_a2a(agent, port=port)
+    app.add_middleware(AgentCardETagMiddleware)
+    return app
+
+
+async def _benchmark(calls: int, port: int):
+    import subprocess
+    import sys
+    from sessions import AgentSessions
+
+    server = subprocess.Popen([sys.executable, __file__, "--serve", "--port", str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://localhost:{port}"  # must match the origin the card advertises
+    try:
+        async with httpx.AsyncClient() as probe:
+            for _ in range(100):
+                try:
+                    (await probe.get(url + CARD_PATH)).raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    await asyncio.sleep(0.1)
+
+        sessions = AgentSessions()
+        question = "Where is ORD-1004?"
+
+        async def cold_call(i: int):
+            # A fresh RemoteA2aAgent per hop: its own HTTP client, connection and card fetch
+            agent = RemoteA2aAgent(name="shipping_agent", agent_card=url, description="Shipping.")
+            return await sessions.ask(agent, question, conversation_id=f"cold-{i}")
+
+        pool = A2AClientPool()
+
+        async def warm_call(i: int):
+            # New agent objects still share the pool's connection and cached card
+            await pool.card(url)
+            agent = pool.remote_agent("shipping_agent", url, "Shipping.")
+            return await sessions.ask(agent, question, conversation_id=f"warm-{i}")
+
+        await cold_call(-1)  # warm imports and the server
+        print(f"{'':28} {'avg ms/round trip':>18}")
+        for name, call in [("cold (client + card per hop)", cold_call), ("warm (pooled + cached card)", warm_call)]:
+            start = time.perf_counter()
+            for i in range(calls):
+                answer = await call(i)
+            print(f"{name:28} {1000 * (time.perf_counter() - start) / calls:18.1f}   last answer: {answer!r}")
+
+        pool.card_ttl = 0  # force revalidation: an unchanged card comes back as 304
+        await pool.card(url)
+        print(f"card stats: {pool.stats}, breaker: {pool.breaker(url).stats}")
+        await pool.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold vs warm A2A round trips against a local stub to_a2a server")
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--serve", action="store_true", help="Run the stub server (used by the benchmark)")
+    args = parser.parse_args()
+    if args.serve:
+        import uvicorn
+        uvicorn.run(_stub_app(args.port), port=args.port, log_level="warning")
+    else:
+        asyncio.run(_benchmark(args.calls, args.port))
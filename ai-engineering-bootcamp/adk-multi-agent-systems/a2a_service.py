@@ -0,0 +1,213 @@
+"""
+Serving helpers for running an A2A agent as a scaled service (see shipping_agent.py).
+- ConcurrencyLimitMiddleware: at most `max_concurrent` agent requests run at once per worker. Up to `max_queue` more
+  wait for a slot (for at most `queue_timeout` seconds); beyond that, requests get 429 with a Retry-After estimate,
+  so a burst of slow Gemini calls pushes back on callers instead of piling up inside the worker.
+- MetricsMiddleware: per-route request counts by status code, in-flight requests and latency percentiles,
+  served as JSON on /metrics (per worker process; `pid` says which one answered).
+- add_health_routes: /healthz (process is up) and /readyz (dependencies answer, queue not full). Neither calls the model.
+- AgentCardETagMiddleware: ETag on the agent card and 304 for an unchanged one, so the A2AClientPool card cache
+  (a2a_client.py) revalidates without a download.
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from starlette.responses import JSONResponse
+
+UNLIMITED_PATHS = ("/healthz", "/readyz", "/metrics")
+
+
+def _is_limited(scope) -> bool:
+    """Agent calls are POSTs to the JSON-RPC route; card fetches and probes are never queued."""
+    return scope["type"] == "http" and scope["method"] == "POST" and scope["path"] not in UNLIMITED_PATHS
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(self, app, max_concurrent: int = 8, max_queue: int = 32, queue_timeout: float = 10.0):
+        self.app = app
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots: Optional[asyncio.Semaphore] = None  # created on the server's loop
+        self.running = 0
+        self.waiting = 0
+        self._avg_seconds = 1.0  # moving average of request duration, for Retry-After
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_queue_timeout": 0}
+
+    @property
+    def queue_full(self) -> bool:
+        return self.waiting >= self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: the work ahead of a new request, spread over the slots."""
+        return max(1, math.ceil(self._avg_seconds * (self.waiting + 1) / self.max_concurrent))
+
+    async def _reject(self, send, reason: str):
+        body = f'{{"error": "overloaded", "reason": "{reason}"}}'.encode()
+        await send({"type": "http.response.start", "status": 429, "headers": [
+            (b"content-type", b"application/json"), (b"retry-after", str(self.retry_after()).encode()),
+            (b"content-length", str(len(body)).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if not _is_limited(scope):
+            return await self.app(scope, receive, send)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+
+        if self._slots.locked():
+            if self.queue_full:
+                self.stats["rejected_queue_full"] += 1
+                return await self._reject(send, "queue full")
+            self.stats["queued"] += 1
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            except TimeoutError:
+                self.stats["rejected_queue_timeout"] += 1
+                return await self._reject(send, "queue timeout")
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+
+        self.stats["admitted"] += 1
+        self.running += 1
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)  # the slot is held until the response (or stream) is finished
+        finally:
+            self.running -= 1
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.monotonic() - start)
+            self._slots.release()
+
+
+class MetricsMiddleware:
+    """Latency and status metrics per route, over the last `window` requests of each."""
+
+    def __init__(self, app, window: int = 1000):
+        self.app = app
+        self.window = window
+        self.routes = {}  # "METHOD path" -> {"count", "status": {code: count}, "latencies"}
+        self.in_flight = 0
+        self.started = time.time()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            return await self.app(scope, receive, send)
+        status = 500
+        start = time.perf_counter()
+
+        async def record_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, record_status)
+        finally:
+            self.in_flight -= 1
+            route = self.routes.setdefault(f"{scope['method']} {scope['path']}", {
+                "count": 0, "status": {}, "latencies": deque(maxlen=self.window),
+            })
+            route["count"] += 1
+            route["status"][status] = route["status"].get(status, 0) + 1
+            route["latencies"].append(time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        def percentiles(latencies) -> dict:
+            ordered = sorted(latencies)
+            pick = lambda p: round(1000 * ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1) if ordered else None
+            return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": pick(1.0)}
+
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started),
+            "in_flight": self.in_flight,
+            "routes": {
+                name: {**{k: v for k, v in route.items() if k != "latencies"}, **percentiles(route["latencies"])}
+                for name, route in self.routes.items()
+            },
+        }
+
+
+class AgentCardETagMiddleware:
+    """ASGI middleware: adds an ETag to agent-card responses and answers If-None-Match with 304."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].endswith("agent-card.json"):
+            return await self.app(scope, receive, send)
+
+        start, body = None, []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            else:
+                body.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        if start is None:
+            return  # the app sent no response; let the server report that instead of failing here
+        content = b"".join(body)
+        etag = '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+        headers = [(k, v) for k, v in start.get("headers") or [] if k.lower() not in (b"content-length", b"etag")]
+        headers.append((b"etag", etag.encode()))
+        if start["status"] == 200 and dict(scope["headers"]).get(b"if-none-match", b"").decode() == etag:
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers.append((b"content-length", str(len(content)).encode()))
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": content})
+
+
+def add_health_routes(app, metrics: MetricsMiddleware, limiter: ConcurrencyLimitMiddleware,
+                      ready_checks: dict[str, Callable[[], object]]):
+    """/healthz, /readyz and /metrics on a Starlette app. Ready checks are cheap callables that raise when unhealthy."""
+
+    async def healthz(request):
+        return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+    async def readyz(request):
+        failures = {}
+        for name, check in ready_checks.items():
+            try:
+                check()
+            except Exception as e:
+                failures[name] = str(e)
+        if limiter.queue_full:
+            failures["queue"] = f"{limiter.waiting} requests waiting"
+        body = {"ready": not failures, "pid": os.getpid(), "running": limiter.running, "waiting": limiter.waiting,
+                "failures": failures}
+        return JSONResponse(body, status_code=503 if failures else 200)
+
+    async def metrics_route(request):
+        return JSONResponse({**metrics.snapshot(), "limiter": {**limiter.stats, "running": limiter.running,
+                                                                "waiting": limiter.waiting}})
+
+    app.add_route("/healthz", healthz, methods=["GET"])
+    app.add_route("/readyz", readyz, methods=["GET"])
+    app.add_route("/metrics", metrics_route, methods=["GET"])
+
+
+def scale(app, ready_checks: dict[str, Callable[[], object]], max_concurrent: int = 8, max_queue: int = 32,
+          queue_timeout: float = 10.0):
+    """Wrap a `to_a2a` Starlette app with metrics, a concurrency limit and health routes; returns the ASGI app to serve."""
+    limiter = ConcurrencyLimitMiddleware(app, max_concurrent, max_queue, queue_timeout)
+    metrics = MetricsMiddleware(limiter)
+    add_health_routes(app, metrics, limiter, ready_checks)
+    return metrics
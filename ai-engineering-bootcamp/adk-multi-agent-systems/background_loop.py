@@ -0,0 +1,55 @@
+"""
+A long-lived asyncio event loop on a background thread.
+Synchronous code (like Streamlit callbacks) submits coroutines with run_coroutine_threadsafe instead of calling
+asyncio.run per request, so connections, MCP sessions and other loop-bound resources stay warm between calls.
+Any number of coroutines can run on the loop concurrently.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+
+
+class BackgroundLoop:
+    """Owns one event loop running forever on a daemon thread."""
+
+    def __init__(self, name: str = "agent-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop; returns a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Run a coroutine on the loop and block the calling thread until it finishes or times out."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()  # cancels the task on the loop, so nothing keeps running in the background
+            raise
+
+    def stop(self, timeout: float = 5.0):
+        """Cancel pending tasks and stop the loop thread."""
+        if not self.loop.is_running():
+            return
+
+        async def cancel_pending():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            self.run(cancel_pending(), timeout=timeout)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
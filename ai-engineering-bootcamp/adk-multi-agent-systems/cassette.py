@@ -0,0 +1,82 @@
+"""
+Record/replay ("cassette") adapter for the Gemini calls made by ADK Runners.
+The store and request keys live in the shared llm_cassette package at the repository root; this module only turns
+an LlmRequest into a key and LlmResponses into JSON, so routing and tool-calling demos can be re-run offline,
+deterministically and fast.
+
+Configured with environment variables:
+    LLM_CASSETTE=off|record|replay|auto   auto replays hits and records misses (default off)
+    LLM_CASSETTE_PATH=cassettes/llm.jsonl
+    LLM_CASSETTE_LATENCY_MS=0             simulated latency on replay; "recorded" replays the original latency
+
+Use cassette_model("gemini-2.5-flash") wherever an Agent takes `model=`. With the cassette off it returns
+the model name unchanged; otherwise a CassetteLlm that records or replays every LlmResponse, tool calls included.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from typing import Any, AsyncGenerator, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from llm_cassette import CassetteMiss, open_cassette  # noqa: E402
+
+
+def _without_ids(value):
+    """Drop function call/response ids - ADK generates new ones on every run."""
+    if isinstance(value, dict):
+        return {k: _without_ids(v) for k, v in value.items() if k != "id"}
+    if isinstance(value, list):
+        return [_without_ids(v) for v in value]
+    return value
+
+
+class CassetteLlm(BaseLlm):
+    """Wraps an ADK model; replays recorded LlmResponses and records misses from `inner`."""
+
+    inner: Optional[BaseLlm] = None  # live model; None means replay only
+    store: Any
+
+    def _key(self, llm_request: LlmRequest, stream: bool) -> str:
+        config = llm_request.config.model_dump(mode="json", exclude_none=True) if llm_request.config else {}
+        return self.store.key({
+            "model": self.model,
+            "contents": _without_ids([c.model_dump(mode="json", exclude_none=True) for c in llm_request.contents]),
+            "config": config,
+            "stream": stream,
+        })
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key = self._key(llm_request, stream)
+        entry = self.store.lookup(key, can_record=self.inner is not None)
+        if entry is not None:
+            await asyncio.sleep(self.store.delay(entry))
+            for response in entry["response"]:
+                yield LlmResponse.model_validate(response)
+            return
+
+        start, responses = time.perf_counter(), []
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            responses.append(response.model_dump(mode="json", exclude_none=True))
+            yield response
+        self.store.save(key, responses, time.perf_counter() - start)
+
+
+def cassette_model(model: str):
+    """Model for Agent(model=...): the plain name when LLM_CASSETTE is off, otherwise a CassetteLlm."""
+    store = open_cassette()
+    if store is None:
+        return model
+    inner = None if store.mode == "replay" else LLMRegistry.new_llm(model)
+    return CassetteLlm(model=model, inner=inner, store=store)
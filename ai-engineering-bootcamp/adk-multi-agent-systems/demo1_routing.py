@@ -7,16 +7,25 @@ import asyncio
 import os
 from dotenv import load_dotenv
 from google.adk.agents import Agent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+from cassette import cassette_model
+from sessions import create_agent_sessions
+from fanout import FanOutRouter
+from prerouter import PreRoutedAgent, create_prerouter
+from tool_cache import create_tool_cache
+from kb_search import create_knowledge_base
 
 load_dotenv()
 
-MODEL = "gemini-2.5-flash"
+MODEL = cassette_model("gemini-2.5-flash")  # LLM_CASSETTE=record|replay|auto, see cassette.py
 
 # --- Tools ---
 
+# Repeated lookups with the same arguments are answered from a cache (see tool_cache.py).
+# process_refund and create_escalation_ticket have side effects and always run.
+tool_cache = create_tool_cache()
+knowledge_base = create_knowledge_base()  # BM25 over knowledge_base/*.md, indexed on first search (see kb_search.py)
+
+@tool_cache.memoize(ttl=120)  # invoices change rarely within a conversation
 def lookup_invoice(customer_email: str) -> dict:
     """Look up the most recent invoice for a customer by email."""
     invoices = {
@@ -30,18 +39,15 @@ def process_refund(invoice_id: str, reason: str) -> dict:
     """Process a refund for a specific invoice."""
     return {"refund_id": f"REF-{invoice_id[-3:]}", "status": "approved", "message": f"Refund for {invoice_id} approved. 5-7 business days."}
 
-def search_knowledge_base(query: str) -> dict:
-    """Search the knowledge base for technical solutions."""
-    articles = {
-        "login": {"title": "Login Issues", "solution": "1. Clear cache. 2. Try incognito. 3. Reset password. 4. 3 failed attempts = 30 min lockout."},
-        "crash": {"title": "App Crashing", "solution": "1. Update to v3.2.1. 2. Clear app data. 3. Check OS: iOS 16+ / Android 13+."},
-        "slow": {"title": "Performance Issues", "solution": "1. Check internet (min 5 Mbps). 2. Close other apps. 3. Enable hardware acceleration."},
-    }
-    for keyword, article in articles.items():
-        if keyword in query.lower():
-            return article
-    return {"title": "General Support", "solution": "No specific article found. Contact support."}
+@tool_cache.memoize(ttl=300)  # articles can be edited; the index picks changes up within KB_SYNC_SECONDS
+async def search_knowledge_base(query: str) -> dict:
+    """Search the knowledge base for technical solutions. Returns the best-matching articles, best first."""
+    results = await knowledge_base.asearch(query, k=3)  # index I/O runs on a worker thread
+    if not results:
+        return {"results": [], "message": "No specific article found. Contact support."}
+    return {"results": results}
 
+@tool_cache.memoize(ttl=15)  # live status: only collapse back-to-back checks
 def check_system_status() -> dict:
     """Check current status of all platform services."""
     return {
@@ -84,17 +90,24 @@ root_agent = Agent(
     sub_agents=[billing_agent, technical_agent, escalation_agent],
 )
 
+# Obvious queries go straight to the specialist; root_agent's routing call only runs when the rules are unsure
+prerouted_agent = PreRoutedAgent(name="customer_support", router=root_agent, prerouter=create_prerouter(
+    billing="billing_agent", technical="technical_agent", escalation="escalation_agent"))
+
+# Fan-out mode: every specialist a multi-part query needs answers at once (see fanout.py).
+# An agent can only have one parent, so the fan-out router gets its own copies of the specialists.
+fanout_agent = FanOutRouter(
+    name="customer_support_fanout", model=MODEL, branch_timeout=30.0,
+    sub_agents=[agent.clone() for agent in (billing_agent, technical_agent, escalation_agent)],
+)
+
 # --- Runner ---
 
-async def ask(agent, message):
-    service = InMemorySessionService()
-    runner = Runner(agent=agent, app_name="demo", session_service=service)
-    session = await service.create_session(app_name="demo", user_id="user1")
-    content = types.Content(role="user", parts=[types.Part(text=message)])
-    async for event in runner.run_async(user_id="user1", session_id=session.id, new_message=content):
-        if event.is_final_response() and event.content and event.content.parts:
-            return event.content.parts[0].text
-    return "(no response)"
+# One warm runner per agent tree; each conversation id keeps its own session history (see sessions.py)
+sessions = create_agent_sessions()
+
+async def ask(agent, message, conversation_id="default"):
+    return await sessions.ask(agent, message, conversation_id=conversation_id)
 
 async def main():
     tests = [
@@ -105,7 +118,14 @@ async def main():
     for label, query in tests:
         print(f"\n--- {label} ---")
         print(f"User: {query}\n")
-        print(f"Agent: {await ask(root_agent, query)}\n")
+        print(f"Agent: {await ask(prerouted_agent, query, conversation_id=label)}\n")
+
+    query = "My invoice for bob@example.com looks wrong and the app crashes when I open it."
+    print("\n--- MULTI-PART (FAN-OUT) ---")
+    print(f"User: {query}\n")
+    print(f"Agent: {await ask(fanout_agent, query, conversation_id='MULTI-PART')}\n")
+    print(prerouted_agent.prerouter.report())
+    print(tool_cache.report())
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -11,13 +11,14 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from google.adk.agents import Agent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.tools.mcp_tool import McpToolset, StdioConnectionParams
-from google.genai import types
+from google.adk.tools.mcp_tool import StdioConnectionParams
 from mcp.client.stdio import StdioServerParameters
+from cassette import cassette_model
+from sessions import create_agent_sessions
+from mcp_pool import McpPool
+from mcp_schema_cache import create_schema_cache
 
-MODEL = "gemini-2.5-flash"
+MODEL = cassette_model("gemini-2.5-flash")  # LLM_CASSETTE=record|replay|auto, see cassette.py
 TOKEN = os.getenv("SUPABASE_ACCESS_TOKEN", "")
 PROJECT_REF = os.getenv("SUPABASE_PROJECT_REF", "")
 
@@ -30,12 +31,12 @@ mcp_args = ["-y", "@supabase/mcp-server-supabase@latest", "--access-token", TOKE
 if PROJECT_REF:
     mcp_args += ["--project-ref", PROJECT_REF]
 
-supabase_mcp = McpToolset(
-    connection_params=StdioConnectionParams(
-        server_params=StdioServerParameters(command="npx", args=mcp_args),
-        timeout=30.0,
-    ),
-)
+# One server process for the whole run: started on first use, health-checked, closed at exit (see mcp_pool.py)
+mcp_pool = McpPool(schema_cache=create_schema_cache())  # cached tool schemas skip discovery at startup
+supabase_mcp = mcp_pool.toolset("supabase", StdioConnectionParams(
+    server_params=StdioServerParameters(command="npx", args=mcp_args),
+    timeout=30.0,
+))
 
 # --- Agent ---
 
@@ -49,25 +50,24 @@ billing_agent = Agent(
 
 # --- Runner ---
 
-async def ask(agent, message):
-    service = InMemorySessionService()
-    runner = Runner(agent=agent, app_name="demo", session_service=service)
-    session = await service.create_session(app_name="demo", user_id="user1")
-    content = types.Content(role="user", parts=[types.Part(text=message)])
-    async for event in runner.run_async(user_id="user1", session_id=session.id, new_message=content):
-        if event.is_final_response() and event.content and event.content.parts:
-            return event.content.parts[0].text
-    return "(no response)"
+# One warm runner per agent tree; each conversation id keeps its own session history (see sessions.py)
+sessions = create_agent_sessions()
+
+async def ask(agent, message, conversation_id="default"):
+    return await sessions.ask(agent, message, conversation_id=conversation_id)
 
 async def main():
     tests = [
         ("CUSTOMER LOOKUP", "What orders does Bob Smith have? What's the total amount?"),
         ("CROSS-TABLE QUERY", "Show me all high-priority open support tickets with customer name and email."),
     ]
-    for label, query in tests:
-        print(f"\n--- {label} ---")
-        print(f"User: {query}\n")
-        print(f"Agent: {await ask(billing_agent, query)}\n")
+    try:
+        for label, query in tests:
+            print(f"\n--- {label} ---")
+            print(f"User: {query}\n")
+            print(f"Agent: {await ask(billing_agent, query, conversation_id=label)}\n")
+    finally:
+        await mcp_pool.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
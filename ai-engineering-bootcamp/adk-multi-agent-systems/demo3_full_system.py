@@ -12,29 +12,34 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from google.adk.agents import Agent
-from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.tools.mcp_tool import McpToolset, StdioConnectionParams
-from google.genai import types
+from google.adk.tools.mcp_tool import StdioConnectionParams
 from mcp.client.stdio import StdioServerParameters
-
-MODEL = "gemini-2.5-flash"
+from cassette import cassette_model
+from sessions import create_agent_sessions
+from fanout import FanOutRouter
+from prerouter import PreRoutedAgent, create_prerouter
+from a2a_client import create_a2a_pool
+from mcp_pool import McpPool
+from mcp_schema_cache import create_schema_cache
+from tool_cache import create_tool_cache
+from kb_search import create_knowledge_base
+
+MODEL = cassette_model("gemini-2.5-flash")  # LLM_CASSETTE=record|replay|auto, see cassette.py
 
 # --- Layer 1: Technical Agent (local tools) ---
 
-def search_knowledge_base(query: str) -> dict:
-    """Search the knowledge base for technical solutions."""
-    articles = {
-        "login": {"title": "Login Issues", "solution": "1. Clear cache. 2. Try incognito. 3. Reset password."},
-        "crash": {"title": "App Crashing", "solution": "1. Update to v3.2.1. 2. Clear app data. 3. Check OS requirements."},
-        "slow": {"title": "Performance Issues", "solution": "1. Check internet. 2. Close other apps. 3. Enable hardware acceleration."},
-    }
-    for keyword, article in articles.items():
-        if keyword in query.lower():
-            return article
-    return {"title": "General Support", "solution": "No specific article found."}
+tool_cache = create_tool_cache()  # repeated lookups are answered from a cache (see tool_cache.py)
+knowledge_base = create_knowledge_base()  # BM25 over knowledge_base/*.md, indexed on first search (see kb_search.py)
+
+@tool_cache.memoize(ttl=300)  # articles can be edited; the index picks changes up within KB_SYNC_SECONDS
+async def search_knowledge_base(query: str) -> dict:
+    """Search the knowledge base for technical solutions. Returns the best-matching articles, best first."""
+    results = await knowledge_base.asearch(query, k=3)  # index I/O runs on a worker thread
+    if not results:
+        return {"results": [], "message": "No specific article found. Contact support."}
+    return {"results": results}
 
+@tool_cache.memoize(ttl=15)  # live status: only collapse back-to-back checks
 def check_system_status() -> dict:
     """Check current status of all platform services."""
     return {"overall": "operational", "auth_service": "degraded", "last_incident": "2026-02-08"}
@@ -58,12 +63,12 @@ mcp_args = ["-y", "@supabase/mcp-server-supabase@latest", "--access-token", TOKE
 if PROJECT_REF:
     mcp_args += ["--project-ref", PROJECT_REF]
 
-supabase_mcp = McpToolset(
-    connection_params=StdioConnectionParams(
-        server_params=StdioServerParameters(command="npx", args=mcp_args),
-        timeout=30.0,
-    ),
-)
+# One server process for the whole run: started on first use, health-checked, closed at exit (see mcp_pool.py)
+mcp_pool = McpPool(schema_cache=create_schema_cache())  # cached tool schemas skip discovery at startup
+supabase_mcp = mcp_pool.toolset("supabase", StdioConnectionParams(
+    server_params=StdioServerParameters(command="npx", args=mcp_args),
+    timeout=30.0,
+))
 
 billing_agent = Agent(
     name="billing_agent_mcp", model=MODEL,
@@ -74,10 +79,11 @@ billing_agent = Agent(
 
 # --- Layer 3: Shipping Agent (A2A -> remote service) ---
 
-shipping_agent = RemoteA2aAgent(
-    name="shipping_agent",
-    agent_card="http://localhost:8001",
-    description="Remote agent for shipping and delivery tracking via A2A protocol.",
+# Keep-alive connection, cached agent card and circuit breaker shared by every hop (see a2a_client.py)
+a2a_pool = create_a2a_pool()
+shipping_agent = a2a_pool.remote_agent(
+    "shipping_agent", "http://localhost:8001",
+    "Remote agent for shipping and delivery tracking via A2A protocol.",
 )
 
 # --- Root Router ---
@@ -89,17 +95,25 @@ root_agent = Agent(
     sub_agents=[billing_agent, technical_agent, shipping_agent],
 )
 
+# Obvious queries go straight to the specialist; root_agent's routing call only runs when the rules are unsure
+prerouted_agent = PreRoutedAgent(name="full_support", router=root_agent, prerouter=create_prerouter(
+    billing="billing_agent_mcp", technical="technical_agent", shipping="shipping_agent"))
+
+# Fan-out mode for multi-part queries: the needed specialists answer concurrently (see fanout.py).
+# The remote shipping agent gets a shorter timeout, so a slow A2A call still leaves the other answers.
+fanout_agent = FanOutRouter(
+    name="full_support_fanout", model=MODEL,
+    branch_timeout=60.0, branch_timeouts={"shipping_agent": 20.0},
+    sub_agents=[agent.clone() for agent in (billing_agent, technical_agent, shipping_agent)],
+)
+
 # --- Runner ---
 
-async def ask(agent, message):
-    service = InMemorySessionService()
-    runner = Runner(agent=agent, app_name="demo", session_service=service)
-    session = await service.create_session(app_name="demo", user_id="user1")
-    content = types.Content(role="user", parts=[types.Part(text=message)])
-    async for event in runner.run_async(user_id="user1", session_id=session.id, new_message=content):
-        if event.is_final_response() and event.content and event.content.parts:
-            return event.content.parts[0].text
-    return "(no response)"
+# One warm runner per agent tree; each conversation id keeps its own session history (see sessions.py)
+sessions = create_agent_sessions()
+
+async def ask(agent, message, conversation_id="default"):
+    return await sessions.ask(agent, message, conversation_id=conversation_id)
 
 async def main():
     scenarios = [
@@ -107,10 +121,21 @@ async def main():
         ("TECHNICAL (Local)", "My app is really slow lately. Is something wrong with your servers?"),
         ("SHIPPING (A2A)", "Where is my package for order ORD-1004? When will it arrive?"),
     ]
-    for label, query in scenarios:
-        print(f"\n--- {label} ---")
+    try:
+        for label, query in scenarios:
+            print(f"\n--- {label} ---")
+            print(f"User: {query}\n")
+            print(f"Agent: {await ask(prerouted_agent, query, conversation_id=label)}\n")
+
+        query = "I'm Jane Doe (jane@example.com). What plan am I on, and where is my order ORD-1004?"
+        print("\n--- MULTI-PART (FAN-OUT) ---")
         print(f"User: {query}\n")
-        print(f"Agent: {await ask(root_agent, query)}\n")
+        print(f"Agent: {await ask(fanout_agent, query, conversation_id='MULTI-PART')}\n")
+        print(prerouted_agent.prerouter.report())
+        print(tool_cache.report())
+    finally:
+        await mcp_pool.close()
+        await a2a_pool.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
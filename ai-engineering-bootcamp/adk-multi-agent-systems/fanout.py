@@ -0,0 +1,132 @@
+"""
+Fan-out routing: answer every part of a multi-part query at once instead of one specialist at a time.
+FanOutRouter makes one model call to pick the specialists a query needs, then runs them concurrently with ParallelAgent
+semantics: each specialist runs on its own branch of the session, and their events are streamed as they arrive.
+Each branch has a timeout (`branch_timeout`, overridable per agent in `branch_timeouts`).
+A branch that is too slow or fails is cancelled, and the merged answer says which part is still pending,
+so e.g. a slow A2A shipping agent no longer holds back the billing and technical answers.
+
+The merged answer is the specialists' answers joined under their names, with no extra model call.
+Per-branch status and timing are written to session state under `<router name>_branches`.
+"""
+
+import asyncio
+import re
+import time
+from contextlib import aclosing
+from typing import AsyncGenerator, Optional, Union
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models.base_llm import BaseLlm
+from google.genai import types
+
+
+def _final_text(event: Event) -> Optional[str]:
+    if event.is_final_response() and event.content and event.content.parts:
+        return "".join(part.text for part in event.content.parts if part.text) or None
+    return None
+
+
+class FanOutRouter(BaseAgent):
+    """Routes a query to every specialist it needs, runs them in parallel and merges their answers."""
+
+    model: Union[str, BaseLlm] = "gemini-2.5-flash"
+    branch_timeout: float = 30.0
+    branch_timeouts: dict[str, float] = {}
+    selector: Optional[LlmAgent] = None
+
+    def model_post_init(self, context):
+        super().model_post_init(context)
+        for agent in self.sub_agents:
+            if isinstance(agent, LlmAgent):
+                # Branches answer on their own; a transfer inside a parallel branch would hijack the conversation
+                agent.disallow_transfer_to_parent = agent.disallow_transfer_to_peers = True
+        if self.selector is None:
+            self.selector = LlmAgent(
+                name=f"{self.name}_selector", model=self.model,
+                instruction=self._selector_instruction,
+                disallow_transfer_to_parent=True, disallow_transfer_to_peers=True,
+            )
+
+    def _selector_instruction(self, readonly_context) -> str:
+        specialists = "\n".join(f"- {agent.name}: {agent.description}" for agent in self.sub_agents)
+        return (
+            "Decide which specialists are needed to fully answer the user's latest message. "
+            "Pick every specialist that covers a part of it, and no others.\n"
+            f"{specialists}\n"
+            "Reply with only their names, comma separated."
+        )
+
+    def _select(self, reply: str) -> list:
+        # Exact names only: "technical_agent_v2" or "billing_agent." must not pick technical_agent by substring
+        names = {token.strip(".`*'\"") for token in re.split(r"[\s,;]+", reply or "")}
+        chosen = [agent for agent in self.sub_agents if agent.name in names]
+        return chosen or list(self.sub_agents)  # unparseable choice: ask everyone rather than no one
+
+    def _branch_ctx(self, agent: BaseAgent, ctx: InvocationContext) -> InvocationContext:
+        """Context for one specialist on its own branch of the session, as ParallelAgent isolates its sub-agents."""
+        branch = f"{self.name}.{agent.name}"
+        return ctx.model_copy(update={"branch": f"{ctx.branch}.{branch}" if ctx.branch else branch})
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        reply = None
+        async with aclosing(self.selector.run_async(ctx)) as events:
+            async for event in events:
+                reply = _final_text(event) or reply
+                yield event
+        chosen = self._select(reply)
+
+        branches = {agent.name: {"status": "running", "seconds": None, "text": None} for agent in chosen}
+        queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._run_branch(agent, ctx, queue, branches[agent.name])) for agent in chosen]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                event, resume = await queue.get()
+                if event is None:
+                    remaining -= 1
+                    continue
+                yield event
+                resume.set()  # the runner has stored the event; let that branch continue
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        yield Event(
+            author=self.name, invocation_id=ctx.invocation_id, branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=self._merge(branches))]),
+            actions=EventActions(state_delta={f"{self.name}_branches": branches}),
+        )
+
+    async def _run_branch(self, agent: BaseAgent, ctx: InvocationContext, queue: asyncio.Queue, result: dict):
+        timeout = result["timeout"] = self.branch_timeouts.get(agent.name, self.branch_timeout)
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(timeout):
+                async with aclosing(agent.run_async(self._branch_ctx(agent, ctx))) as events:
+                    async for event in events:
+                        result["text"] = _final_text(event) or result["text"]
+                        resume = asyncio.Event()
+                        await queue.put((event, resume))
+                        await resume.wait()
+            result["status"] = "ok"
+        except TimeoutError:
+            result["status"] = "timeout"
+        except Exception as e:
+            result["status"] = f"error: {e}"
+        finally:
+            result["seconds"] = round(time.monotonic() - start, 2)
+            await queue.put((None, None))
+
+    def _merge(self, branches: dict) -> str:
+        sections = []
+        for name, result in branches.items():
+            if result["status"] == "ok":
+                sections.append(f"**{name}**\n{result['text'] or '(no answer)'}")
+            elif result["status"] == "timeout":
+                sections.append(f"**{name}**\nNo answer within {result['timeout']:g}s; this part is still pending.")
+            else:
+                sections.append(f"**{name}**\nCould not answer this part ({result['status']}).")
+        return "\n\n".join(sections)
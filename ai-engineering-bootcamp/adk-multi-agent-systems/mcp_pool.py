@@ -0,0 +1,233 @@
+"""
+Warm pool of MCP server connections for ADK agents.
+PooledMcpToolset is a drop-in toolset that agents keep for the lifetime of the app. The MCPSessionManager behind it
+(one MCP server subprocess + session) is started once and shared by every agent run:
+- tool discovery (list_tools) runs once per server start and is then served from memory; with a ToolSchemaCache
+  it is skipped entirely when the schemas on disk are still current (see mcp_schema_cache.py)
+- a background task pings the server every `health_interval` seconds and restarts it if it stopped answering
+- a server unused for `idle_timeout` seconds is shut down, and started again on next use
+
+All use must happen on one event loop (the Streamlit app's BackgroundLoop, or the demo's asyncio.run).
+
+Benchmark cold (new server per query) vs warm (pooled) latency against the local stand-in server:
+    python mcp_pool.py --queries 5 --startup-delay 2
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Optional
+
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.mcp_tool import McpTool, McpToolset, StdioConnectionParams
+from google.adk.tools.mcp_tool.mcp_session_manager import MCPSessionManager
+from mcp.client.stdio import StdioServerParameters
+
+from mcp_schema_cache import ToolSchemaCache, schema_hash, server_version
+
+
+class PooledMcpToolset(BaseToolset):
+    """Shares one long-lived, health-checked MCP session across agents and runs."""
+
+    def __init__(self, name: str, connection_params, idle_timeout: float = 600.0,
+                 health_interval: float = 30.0, health_timeout: float = 10.0,
+                 schema_cache: Optional[ToolSchemaCache] = None):
+        super().__init__()
+        self.name = name
+        self.connection_params = connection_params
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.schema_cache = schema_cache
+        self._cache_key = ToolSchemaCache.key(connection_params)
+        self._sessions: Optional[MCPSessionManager] = None  # the live server; None while stopped
+        self._tools = None
+        self._last_used = 0.0
+        self._lock = asyncio.Lock()
+        self._monitor: Optional[asyncio.Task] = None
+        self._validation: Optional[asyncio.Task] = None
+        self.stats = {"starts": 0, "restarts": 0, "idle_stops": 0, "health_checks": 0,
+                      "health_failures": 0, "discovery_hits": 0, "schema_cache_hits": 0,
+                      "schema_invalidations": 0, "schema_validation_failures": 0}
+
+    async def start(self):
+        """Start the server and discover its tools now instead of on the first query."""
+        self._last_used = time.monotonic()
+        async with self._lock:
+            if self._sessions is None:
+                sessions = MCPSessionManager(self.connection_params)
+                entry = self.schema_cache.get(self._cache_key) if self.schema_cache else None
+                try:
+                    if entry is None:
+                        await self._discover(sessions)
+                    else:
+                        # Tools are usable right away; the session connects on first call or during validation
+                        self._tools = self._wrap(sessions, self.schema_cache.tools(entry))
+                        self.stats["schema_cache_hits"] += 1
+                except BaseException:
+                    await sessions.close()
+                    raise
+                self._sessions = sessions
+                self.stats["starts"] += 1
+                if entry is not None:
+                    self._validation = asyncio.create_task(self._validate(sessions, entry))
+            if self._monitor is None or self._monitor.done():
+                self._monitor = asyncio.create_task(self._watch(), name=f"mcp-pool-{self.name}")
+
+    async def get_tools(self, readonly_context=None) -> list:
+        if self._sessions is not None:
+            self.stats["discovery_hits"] += 1
+        await self.start()
+        return [tool for tool in self._tools if self._is_tool_selected(tool, readonly_context)]
+
+    def _wrap(self, sessions: MCPSessionManager, mcp_tools: list) -> list:
+        tools = [McpTool(mcp_tool=tool, mcp_session_manager=sessions) for tool in mcp_tools]
+        return sorted(tools, key=lambda tool: tool.name)
+
+    async def _discover(self, sessions: MCPSessionManager):
+        session = await sessions.create_session()
+        result = await session.list_tools()
+        self._tools = self._wrap(sessions, result.tools)
+        if self.schema_cache is not None:
+            self.schema_cache.put(self._cache_key, result.tools, server_version(session))
+
+    async def _validate(self, sessions: MCPSessionManager, entry: dict):
+        """Check cached schemas against the live server, replacing them if they changed."""
+        try:
+            session = await sessions.create_session()
+            version = server_version(session)
+            if version is not None and version == entry["server_version"]:
+                return
+            result = await session.list_tools()
+            fresh = self.schema_cache.put(self._cache_key, result.tools, version)
+            if fresh["tools_hash"] != schema_hash(entry["tools"]):
+                self.stats["schema_invalidations"] += 1
+                if self._sessions is sessions:
+                    self._tools = self._wrap(sessions, result.tools)
+        except Exception:
+            self.stats["schema_validation_failures"] += 1  # a dead server is the health check's problem
+
+    async def validated(self):
+        """Wait for the background check of cached schemas, if one is running."""
+        if self._validation is not None:
+            await self._validation
+
+    async def healthy(self) -> bool:
+        """Ping the server over the live session."""
+        if self._sessions is None:
+            return False
+        self.stats["health_checks"] += 1
+        try:
+            # create_session() returns the existing session, reconnecting first if it was dropped
+            session = await self._sessions.create_session()
+            await asyncio.wait_for(session.send_ping(), self.health_timeout)
+            return True
+        except Exception:
+            self.stats["health_failures"] += 1
+            return False
+
+    async def restart(self):
+        await self._stop_server()
+        self.stats["restarts"] += 1
+        await self.start()
+
+    async def _watch(self):
+        while self._sessions is not None:
+            await asyncio.sleep(self.health_interval)
+            if time.monotonic() - self._last_used > self.idle_timeout:
+                await self._stop_server()
+                self.stats["idle_stops"] += 1
+                return
+            if not await self.healthy():
+                try:
+                    await self.restart()
+                except Exception:
+                    pass  # server still down; the next query retries the start
+
+    async def _stop_server(self):
+        if self._validation is not None and not self._validation.done():
+            self._validation.cancel()
+        async with self._lock:
+            sessions, self._sessions, self._tools = self._sessions, None, None
+        if sessions is not None:
+            await sessions.close()
+
+    async def close(self):
+        if self._monitor is not None and self._monitor is not asyncio.current_task():
+            self._monitor.cancel()
+        await self._stop_server()
+
+
+class McpPool:
+    """Named PooledMcpToolsets, so every agent built for the same server shares one connection."""
+
+    def __init__(self, **defaults):
+        self.defaults = defaults
+        self._toolsets = {}
+
+    def toolset(self, name: str, connection_params) -> PooledMcpToolset:
+        if name not in self._toolsets:
+            self._toolsets[name] = PooledMcpToolset(name, connection_params, **self.defaults)
+        return self._toolsets[name]
+
+    def stats(self) -> dict:
+        return {name: toolset.stats for name, toolset in self._toolsets.items()}
+
+    async def close(self):
+        for toolset in self._toolsets.values():
+            await toolset.close()
+
+
+def standin_connection_params(startup_delay: float = 0.0) -> StdioConnectionParams:
+    """Connection to the local stand-in server (mcp_standin_server.py)."""
+    return StdioConnectionParams(
+        server_params=StdioServerParameters(
+            command=sys.executable, args=["mcp_standin_server.py", "--startup-delay", str(startup_delay)]
+        ),
+        timeout=30.0 + startup_delay,
+    )
+
+
+# --- Cold vs warm benchmark ---
+
+async def _query(toolset) -> float:
+    """What an agent run needs from MCP: discover tools, then call one."""
+    start = time.perf_counter()
+    tools = {tool.name: tool for tool in await toolset.get_tools()}
+    await tools["execute_sql"].run_async(args={"query": "SELECT name, plan FROM customers"}, tool_context=None)
+    return time.perf_counter() - start
+
+
+async def _benchmark(queries: int, startup_delay: float):
+    params = standin_connection_params(startup_delay)
+
+    cold = []
+    for _ in range(queries):
+        toolset = McpToolset(connection_params=params)  # what the Streamlit factories did per button press
+        try:
+            cold.append(await _query(toolset))
+        finally:
+            await toolset.close()
+
+    pool = McpPool()
+    pooled = pool.toolset("standin", params)
+    start = time.perf_counter()
+    await pooled.start()  # pre-start, as the app does at launch
+    prestart = time.perf_counter() - start
+    warm = [await _query(pooled) for _ in range(queries)]
+    healthy = await pooled.healthy()
+    await pool.close()
+
+    print(f"{'':24} {'mean ms':>10} {'max ms':>10}")
+    for name, samples in [("cold (server per query)", cold), ("warm (pooled)", warm)]:
+        print(f"{name:24} {1000 * sum(samples) / len(samples):10.1f} {1000 * max(samples):10.1f}")
+    print(f"pool pre-start: {1000 * prestart:.1f} ms (paid once), healthy: {healthy}, stats: {pooled.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold vs warm MCP latency against the local stand-in server")
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--startup-delay", type=float, default=0.0, help="Simulated server startup (npx) seconds")
+    args = parser.parse_args()
+    asyncio.run(_benchmark(args.queries, args.startup_delay))
@@ -0,0 +1,156 @@
+"""
+On-disk cache of MCP tool schemas, so agents can start without waiting for `list_tools` discovery.
+Entries are keyed by a hash of the server command, url and args with credential flags (--access-token and the like)
+left out. The key follows the Supabase project ref, survives token rotation and is never derived from a secret.
+With an entry, the agent's first model call goes out immediately with the cached schemas.
+The server then starts in the background, and the entry is validated lazily:
+- if the server reports a version and it matches the cached one, the entry is still valid
+- otherwise list_tools runs and the schemas are compared by hash; on a change the cache and live tools are replaced
+
+MCP_SCHEMA_CACHE sets the file (default .mcp_schema_cache.json); MCP_SCHEMA_CACHE=off disables it.
+
+Measure the startup saving (time until the first model call can be sent) against the local stand-in server:
+    python mcp_schema_cache.py --starts 3 --startup-delay 2
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Optional
+
+import mcp.types
+
+# Flags whose value is a secret; they (and their value) never take part in the cache key
+CREDENTIAL_FLAGS = {"--access-token", "--api-key", "--token", "--password", "--secret"}
+KEY_VERSION = "v2"  # v1 keys hashed the full args, tokens included; such entries are dropped on load
+
+
+class ToolSchemaCache:
+    """JSON file of {server key: {server_version, tools_hash, tools, validated_at}}."""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            entries = {}
+        self._entries = {key: entry for key, entry in entries.items() if key.startswith(f"{KEY_VERSION}-")}
+
+    @staticmethod
+    def key(connection_params) -> str:
+        server = getattr(connection_params, "server_params", connection_params)
+        identity = {
+            "command": getattr(server, "command", None),
+            "args": public_args(getattr(server, "args", None) or []),
+            "url": getattr(server, "url", None),
+        }
+        return f"{KEY_VERSION}-" + hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._entries.get(key)
+
+    def tools(self, entry: dict) -> list:
+        return [mcp.types.Tool.model_validate(tool) for tool in entry["tools"]]
+
+    def put(self, key: str, tools: list, server_version: Optional[str]) -> dict:
+        dumped = [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools]
+        entry = {
+            "server_version": server_version,
+            "tools_hash": schema_hash(dumped),
+            "tools": dumped,
+            "validated_at": time.time(),
+        }
+        self._entries[key] = entry
+        self.save()
+        return entry
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as f:
+            json.dump(self._entries, f, indent=1)
+        os.replace(f.name, self.path)
+
+
+def public_args(args: list) -> list:
+    """Server args without credential flags and their values ("--access-token X" and "--access-token=X")."""
+    public, skip_value = [], False
+    for arg in args:
+        if skip_value:
+            skip_value = False
+            continue
+        flag, has_value, _ = str(arg).partition("=")
+        if flag in CREDENTIAL_FLAGS:
+            skip_value = not has_value
+            continue
+        public.append(arg)
+    return public
+
+
+def schema_hash(dumped_tools: list) -> str:
+    ordered = sorted(dumped_tools, key=lambda tool: tool["name"])
+    return hashlib.sha256(json.dumps(ordered, sort_keys=True).encode()).hexdigest()
+
+
+def server_version(session) -> Optional[str]:
+    """`name/version` from the initialize handshake; None if the server (or mcp 1.x client) doesn't report one."""
+    info = getattr(session, "server_info", None)
+    if info is None or not getattr(info, "version", None):
+        return None
+    return f"{info.name}/{info.version}"
+
+
+def create_schema_cache() -> Optional[ToolSchemaCache]:
+    path = os.getenv("MCP_SCHEMA_CACHE", ".mcp_schema_cache.json")
+    if path.lower() in ("", "off", "0", "false"):
+        return None
+    return ToolSchemaCache(path)
+
+
+# --- Startup benchmark ---
+
+async def _benchmark(starts: int, startup_delay: float):
+    from mcp_pool import McpPool, standin_connection_params
+
+    params = standin_connection_params(startup_delay)
+    path = os.path.join(tempfile.mkdtemp(), "schemas.json")
+
+    async def app_start(cache) -> tuple:
+        """A fresh process: build the toolset and wait until the agent could send its first model call."""
+        pool = McpPool(schema_cache=cache)
+        toolset = pool.toolset("standin", params)
+        start = time.perf_counter()
+        await toolset.get_tools()
+        ready = time.perf_counter() - start
+        await toolset.validated()
+        validated = time.perf_counter() - start
+        stats = dict(toolset.stats)
+        await pool.close()
+        return ready, validated, stats
+
+    rows = {"no cache": [], "cold cache (first run)": [], "warm cache": []}
+    for _ in range(starts):
+        rows["no cache"].append(await app_start(None))
+    rows["cold cache (first run)"].append(await app_start(ToolSchemaCache(path)))
+    for _ in range(starts):
+        rows["warm cache"].append(await app_start(ToolSchemaCache(path)))  # reloaded from disk, like a restart
+
+    print(f"{'':24} {'first call ready ms':>20} {'validated ms':>14}")
+    for name, samples in rows.items():
+        ready = 1000 * sum(s[0] for s in samples) / len(samples)
+        validated = 1000 * sum(s[1] for s in samples) / len(samples)
+        print(f"{name:24} {ready:20.1f} {validated:14.1f}")
+    print(f"last warm start stats: {rows['warm cache'][-1][2]}")
+    print("With a warm cache the server startup overlaps the first model call instead of preceding it.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agent startup with and without the MCP tool schema cache")
+    parser.add_argument("--starts", type=int, default=3)
+    parser.add_argument("--startup-delay", type=float, default=0.0, help="Simulated server startup (npx) seconds")
+    args = parser.parse_args()
+    asyncio.run(_benchmark(args.starts, args.startup_delay))
@@ -0,0 +1,61 @@
+"""
+Local stdio MCP server standing in for the Supabase MCP server.
+Serves `list_tables` and `execute_sql` over an in-memory SQLite copy of the demo schema
+(customers, orders, support_tickets), so MCP startup and call latency can be measured without npx or Supabase.
+
+Run (normally launched by an MCP client, e.g. `python mcp_pool.py`):
+    python mcp_standin_server.py --startup-delay 3   # simulate npx resolving the package
+"""
+
+import argparse
+import sqlite3
+import time
+
+try:
+    from mcp.server.fastmcp import FastMCP
+except ImportError:  # mcp 2.x renamed FastMCP to MCPServer
+    from mcp.server.mcpserver import MCPServer as FastMCP
+
+SCHEMA = """
+CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT, email TEXT, plan TEXT);
+CREATE TABLE orders (id INTEGER PRIMARY KEY, customer_id INTEGER, amount REAL, status TEXT, created_at TEXT);
+CREATE TABLE support_tickets (id INTEGER PRIMARY KEY, customer_id INTEGER, subject TEXT, priority TEXT, status TEXT);
+INSERT INTO customers VALUES
+    (1, 'Jane Doe', 'jane@example.com', 'pro'),
+    (2, 'Bob Smith', 'bob@example.com', 'enterprise'),
+    (3, 'Alice Johnson', 'alice@example.com', 'starter');
+INSERT INTO orders VALUES
+    (1, 1, 99.0, 'paid', '2026-01-15'), (2, 2, 299.0, 'overdue', '2026-01-20'),
+    (3, 2, 149.0, 'paid', '2026-02-01'), (4, 3, 49.0, 'paid', '2026-02-03');
+INSERT INTO support_tickets VALUES
+    (1, 2, 'Invoice dispute', 'high', 'open'), (2, 1, 'Login loop', 'medium', 'open'),
+    (3, 3, 'Feature request', 'low', 'closed'), (4, 2, 'Refund delay', 'high', 'open');
+"""
+
+db = sqlite3.connect(":memory:", check_same_thread=False)
+db.executescript(SCHEMA)
+
+mcp = FastMCP("support-db-standin")
+
+
+@mcp.tool()
+def list_tables() -> list:
+    """List the tables in the database."""
+    return [row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+
+
+@mcp.tool()
+def execute_sql(query: str) -> list:
+    """Run a read-only SQL query and return the rows as objects."""
+    if not query.lstrip().lower().startswith("select"):
+        raise ValueError("Only SELECT queries are allowed")
+    cursor = db.execute(query)
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in MCP server for the Supabase demo schema")
+    parser.add_argument("--startup-delay", type=float, default=0.0, help="Seconds to sleep before serving")
+    time.sleep(parser.parse_args().startup_delay)
+    mcp.run()  # stdio transport
@@ -0,0 +1,251 @@
+"""
+Order store behind the shipping agent's tools.
+Backends (ORDER_STORE):
+    sqlite  SQLite file ORDER_DB (default orders.db), default. order_id is the primary key of a WITHOUT ROWID table,
+            so a lookup is one B-tree search whatever the size; reads go through mmap
+    memory  plain dict, for tests and small demos
+An LRU of hot orders (ORDER_CACHE_SIZE, default 10000 entries, ORDER_CACHE_TTL_SECONDS, default 30) sits in front,
+so repeated questions about the same order don't touch the database, and statuses are at most a TTL stale.
+
+A missing database is created with the five demo orders. Load a large synthetic dataset, or measure how lookup latency
+scales with the number of orders:
+    python order_store.py seed --orders 10000000
+    python order_store.py benchmark --sizes 10000 1000000 10000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+FIELDS = ["order_id", "carrier", "tracking", "status", "location", "est_date", "est_window", "est_note"]
+
+DEMO_ORDERS = [
+    ("ORD-1001", "FedEx", "FX-789456123", "in_transit", "Memphis, TN", "2026-02-14", "9 AM - 5 PM", "Signature required"),
+    ("ORD-1002", "UPS", "1Z999AA10123456784", "delivered", "Customer doorstep", "2026-02-11", "Delivered", "Left at front door"),
+    ("ORD-1003", "USPS", "9400111899223100001234", "processing", "Warehouse", "2026-02-18", "TBD", "Still processing"),
+    ("ORD-1004", "DHL", "DHL-5678901234", "out_for_delivery", "Local facility", "2026-02-13", "12 - 4 PM", "Out for delivery today"),
+    ("ORD-1005", "FedEx", "FX-321654987", "in_transit", "Chicago, IL", "2026-02-15", "10 AM - 6 PM", "Standard delivery"),
+]
+
+BATCH = 500  # ids per IN (...) query, well under SQLite's variable limit
+
+
+class MemoryOrderStore:
+    def __init__(self, rows: Iterable[tuple] = DEMO_ORDERS):
+        self._orders = {row[0]: dict(zip(FIELDS, row)) for row in rows}
+
+    def get(self, order_id: str) -> Optional[dict]:
+        return self._orders.get(order_id)
+
+    def get_many(self, order_ids: list) -> dict:
+        return {order_id: self._orders[order_id] for order_id in order_ids if order_id in self._orders}
+
+    def ping(self):
+        """Readiness check: raises if no orders are loaded."""
+        if not self._orders:
+            raise RuntimeError("no orders loaded")
+
+
+class SQLiteOrderStore:
+    """Read-only lookups by primary key; one connection per thread."""
+
+    def __init__(self, path: str, mmap_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+        if not os.path.exists(path):
+            seed(path, 0)
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            db.execute(f"PRAGMA mmap_size = {self.mmap_bytes}")
+        return db
+
+    def get(self, order_id: str) -> Optional[dict]:
+        row = self._db().execute(f"SELECT {', '.join(FIELDS)} FROM orders WHERE order_id = ?", (order_id,)).fetchone()
+        return dict(zip(FIELDS, row)) if row else None
+
+    def get_many(self, order_ids: list) -> dict:
+        found = {}
+        for i in range(0, len(order_ids), BATCH):
+            chunk = order_ids[i:i + BATCH]
+            rows = self._db().execute(
+                f"SELECT {', '.join(FIELDS)} FROM orders WHERE order_id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            found.update((row[0], dict(zip(FIELDS, row))) for row in rows)
+        return found
+
+    def ping(self):
+        """Readiness check: a real query on this thread's connection; raises if the database is unreadable or empty."""
+        if self._db().execute("SELECT 1 FROM orders LIMIT 1").fetchone() is None:
+            raise RuntimeError(f"no orders in {self.path}")
+
+
+class CachedOrderStore:
+    """LRU of recently looked-up orders in front of another store; misses in get_many are fetched in one batch."""
+
+    def __init__(self, store, maxsize: int = 10000, ttl: float = 30.0):
+        self.store = store
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._cache = OrderedDict()  # order_id -> (row or None, cached at)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _cached(self, order_id: str, now: float):
+        with self._lock:
+            entry = self._cache.get(order_id)
+            if entry is None or now - entry[1] > self.ttl:
+                self.stats["misses"] += 1
+                return False, None
+            self._cache.move_to_end(order_id)
+            self.stats["hits"] += 1
+            return True, entry[0]
+
+    def _put(self, order_id: str, row: Optional[dict], now: float):
+        with self._lock:
+            self._cache[order_id] = (row, now)  # unknown ids are cached too, so retries don't hit the database
+            self._cache.move_to_end(order_id)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def get(self, order_id: str) -> Optional[dict]:
+        now = time.monotonic()
+        hit, row = self._cached(order_id, now)
+        if not hit:
+            row = self.store.get(order_id)
+            self._put(order_id, row, now)
+        return row
+
+    def get_many(self, order_ids: list) -> dict:
+        now = time.monotonic()
+        found, missing = {}, []
+        for order_id in dict.fromkeys(order_ids):
+            hit, row = self._cached(order_id, now)
+            if not hit:
+                missing.append(order_id)
+            elif row is not None:
+                found[order_id] = row
+        if missing:
+            fetched = self.store.get_many(missing)
+            for order_id in missing:
+                self._put(order_id, fetched.get(order_id), now)
+            found.update(fetched)
+        return found
+
+    def ping(self):
+        """Readiness check on the underlying store, never answered from the cache."""
+        self.store.ping()
+
+
+def synthetic_orders(count: int) -> Iterable[tuple]:
+    """The demo orders, then `count` generated ones (ORD-1006, ORD-1007, ...)."""
+    yield from DEMO_ORDERS
+    rng = random.Random(42)
+    carriers = ["FedEx", "UPS", "USPS", "DHL"]
+    statuses = ["processing", "in_transit", "out_for_delivery", "delivered"]
+    cities = ["Memphis, TN", "Chicago, IL", "Louisville, KY", "Dallas, TX", "Newark, NJ", "Ontario, CA"]
+    for n in range(1006, 1006 + count):
+        carrier = rng.choice(carriers)
+        yield (f"ORD-{n}", carrier, f"{carrier[:2].upper()}-{rng.randrange(10**9, 10**10)}", rng.choice(statuses),
+               rng.choice(cities), f"2026-03-{rng.randint(1, 28):02d}", "9 AM - 5 PM", "Standard delivery")
+
+
+def seed(path: str, count: int):
+    """(Re)create the database with the demo orders plus `count` synthetic ones."""
+    tmp = f"{path}.{os.getpid()}.tmp"  # several workers may seed a missing database at once
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    db = sqlite3.connect(tmp)
+    db.execute("PRAGMA journal_mode = OFF")
+    db.execute("PRAGMA synchronous = OFF")
+    db.execute(f"CREATE TABLE orders ({', '.join(f + ' TEXT' for f in FIELDS)}, PRIMARY KEY (order_id)) WITHOUT ROWID")
+    # One transaction with no journal: a bulk load, not a live write path
+    db.executemany(f"INSERT INTO orders VALUES ({', '.join('?' * len(FIELDS))})", synthetic_orders(count))
+    db.commit()
+    db.close()
+    os.replace(tmp, path)
+
+
+def create_order_store():
+    """Build from ORDER_STORE, ORDER_DB, ORDER_CACHE_SIZE and ORDER_CACHE_TTL_SECONDS."""
+    if os.getenv("ORDER_STORE", "sqlite").lower() == "memory":
+        store = MemoryOrderStore()
+    else:
+        store = SQLiteOrderStore(os.getenv("ORDER_DB", "orders.db"))
+    return CachedOrderStore(
+        store,
+        maxsize=int(os.getenv("ORDER_CACHE_SIZE", "10000")),
+        ttl=float(os.getenv("ORDER_CACHE_TTL_SECONDS", "30")),
+    )
+
+
+# --- Scaling benchmark ---
+
+def _percentile(samples: list, p: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(p * len(samples)))]
+
+
+def _benchmark(sizes: list, lookups: int):
+    print(f"{'orders':>12} {'build s':>8} {'MB':>7} {'get p50 us':>11} {'get p99 us':>11} "
+          f"{'many(100) ms':>13} {'cached us':>10}")
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = os.path.join(directory, f"orders-{size}.db")
+            start = time.perf_counter()
+            seed(path, size)
+            build = time.perf_counter() - start
+            store = SQLiteOrderStore(path)
+            ids = [f"ORD-{rng.randrange(1001, 1006 + size)}" for _ in range(lookups)]
+
+            samples = []
+            for order_id in ids:
+                start = time.perf_counter()
+                assert store.get(order_id) is not None
+                samples.append(time.perf_counter() - start)
+
+            batches = [ids[i:i + 100] for i in range(0, min(len(ids), 2000), 100)]
+            start = time.perf_counter()
+            for batch in batches:
+                store.get_many(batch)
+            many = (time.perf_counter() - start) / len(batches)
+
+            cached = CachedOrderStore(store)
+            hot = ids[:100]
+            for order_id in hot:
+                cached.get(order_id)
+            start = time.perf_counter()
+            for _ in range(10):
+                for order_id in hot:
+                    cached.get(order_id)
+            hit = (time.perf_counter() - start) / (10 * len(hot))
+
+            print(f"{size:12,} {build:8.1f} {os.path.getsize(path) / 1e6:7.1f} {1e6 * _percentile(samples, 0.5):11.1f} "
+                  f"{1e6 * _percentile(samples, 0.99):11.1f} {1000 * many:13.2f} {1e6 * hit:10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shipping order store: seed a database or benchmark lookup scaling")
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed_parser = commands.add_parser("seed", help="Create ORDER_DB with synthetic orders")
+    seed_parser.add_argument("--orders", type=int, default=1_000_000)
+    bench_parser = commands.add_parser("benchmark", help="Lookup latency vs number of orders")
+    bench_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    bench_parser.add_argument("--lookups", type=int, default=5000)
+    args = parser.parse_args()
+    if args.command == "seed":
+        path = os.getenv("ORDER_DB", "orders.db")
+        start = time.perf_counter()
+        seed(path, args.orders)
+        print(f"Wrote {args.orders + len(DEMO_ORDERS):,} orders to {path} in {time.perf_counter() - start:.1f}s")
+    else:
+        _benchmark(args.sizes, args.lookups)
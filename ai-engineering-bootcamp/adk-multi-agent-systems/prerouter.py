@@ -0,0 +1,260 @@
+"""
+Deterministic fast path in front of an LLM router agent.
+Routing an obvious query ("ORD-1004", "app crashes", "invoice") costs a full Gemini call before any specialist runs.
+PreRoutedAgent first asks a PreRouter, which applies:
+1. keyword/regex rules (the week-1 classifier_node idea): a query matching exactly one specialist goes straight to it
+2. optionally, an embedding classifier over example queries, trusted above a similarity threshold
+Only when neither is sure (no match, or several specialists match, e.g. multi-part questions) does the LLM router run.
+
+PreRouter.report() shows how many requests skipped the routing call, and the latency that saved:
+skipped requests x the measured average duration of the routing calls that did run.
+
+Embeddings are off by default; set PREROUTER_EMBEDDING_MODEL (e.g. gemini-embedding-001) to enable them,
+and PREROUTER_EMBEDDING_THRESHOLD (default 0.75) to tune how sure they must be.
+
+Simulate routing with and without the fast path (stub models, no API key needed):
+    python prerouter.py --routing-ms 800
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import re
+import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Awaitable, Callable, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+
+
+@dataclass
+class Route:
+    patterns: list
+    examples: list = field(default_factory=list)
+
+
+# Routes by role; create_prerouter maps each role to the specialist's agent name in a given tree
+SUPPORT_ROUTES = {
+    "billing": Route(
+        patterns=[r"\binvoices?\b", r"\brefunds?\b", r"\bbill(ing|ed)?\b", r"\bpayments?\b", r"\bcharged?\b", r"\bplan\b"],
+        examples=["Can I get a copy of my latest invoice?", "I was charged twice this month",
+                  "I want a refund for my subscription", "What plan am I on?"],
+    ),
+    "technical": Route(
+        patterns=[r"\bcrash(es|ed|ing)?\b", r"\blog ?in\b", r"\bbugs?\b", r"\berrors?\b", r"\bslow\b", r"\boutage\b",
+                  r"\bnot working\b"],
+        examples=["The app keeps crashing on startup", "I can't log in to my account",
+                  "Everything is really slow today", "Is there an outage right now?"],
+    ),
+    "shipping": Route(
+        patterns=[r"\bORD-\d+\b", r"\bpackages?\b", r"\bshipping\b", r"\bdeliver(y|ed)?\b", r"\btracking\b"],
+        examples=["Where is my package?", "When will order ORD-1001 arrive?", "My delivery is late"],
+    ),
+    "escalation": Route(
+        patterns=[r"\bhack(ed|er)?\b", r"\bfraud\b", r"\bunauthori[sz]ed\b", r"\blawyer\b", r"\bcomplaint\b"],
+        examples=["Someone hacked my account", "I want to file a formal complaint",
+                  "There are unauthorized transactions on my card"],
+    ),
+}
+
+Embedder = Callable[[list], Awaitable[list]]
+
+
+def gemini_embedder(model: str) -> Embedder:
+    """Async text -> vector function backed by the Gemini embeddings API."""
+    from google import genai
+    client = genai.Client()
+
+    async def embed(texts: list) -> list:
+        result = await client.aio.models.embed_content(model=model, contents=texts)
+        return [embedding.values for embedding in result.embeddings]
+
+    return embed
+
+
+def _cosine(a: list, b: list) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)) or 1.0)
+
+
+class EmbeddingClassifier:
+    """Nearest-centroid classifier over embedded example queries."""
+
+    def __init__(self, examples: dict, embed: Embedder, threshold: float = 0.75, margin: float = 0.03):
+        self.examples = {name: texts for name, texts in examples.items() if texts}
+        self.embed = embed
+        self.threshold = threshold
+        self.margin = margin
+        self._centroids = None
+
+    async def _load(self):
+        names = [name for name, texts in self.examples.items() for _ in texts]
+        vectors = await self.embed([text for texts in self.examples.values() for text in texts])
+        centroids = {}
+        for name, vector in zip(names, vectors):
+            centroids.setdefault(name, []).append(vector)
+        self._centroids = {name: [sum(col) / len(vs) for col in zip(*vs)] for name, vs in centroids.items()}
+
+    async def classify(self, text: str) -> Optional[str]:
+        """The best-matching agent, or None if it isn't clearly ahead of the runner-up."""
+        if self._centroids is None:
+            await self._load()
+        [vector] = await self.embed([text])
+        scores = sorted(((_cosine(vector, c), name) for name, c in self._centroids.items()), reverse=True)
+        best, name = scores[0]
+        runner_up = scores[1][0] if len(scores) > 1 else -1.0
+        return name if best >= self.threshold and best - runner_up >= self.margin else None
+
+
+class PreRouter:
+    """Picks a specialist without a model call when the query is unambiguous."""
+
+    def __init__(self, rules: dict, classifier: EmbeddingClassifier = None):
+        self.rules = {name: [re.compile(p, re.IGNORECASE) for p in patterns] for name, patterns in rules.items()}
+        self.classifier = classifier
+        self.stats = {"requests": 0, "rule_routed": 0, "embedding_routed": 0, "llm_routed": 0}
+        self.routing_calls = 0  # LLM routing calls that did run, and their total duration
+        self.routing_call_seconds = 0.0
+        self.preroute_seconds = 0.0
+
+    async def route(self, text: str) -> Optional[str]:
+        start = time.perf_counter()
+        self.stats["requests"] += 1
+        matched = [name for name, patterns in self.rules.items() if any(p.search(text) for p in patterns)]
+        choice = matched[0] if len(matched) == 1 else None
+        if choice:
+            self.stats["rule_routed"] += 1
+        elif self.classifier is not None and not matched:
+            # Several rule matches means several topics; that is the LLM router's (or fan-out's) job
+            choice = await self.classifier.classify(text)
+            if choice:
+                self.stats["embedding_routed"] += 1
+        if choice is None:
+            self.stats["llm_routed"] += 1
+        self.preroute_seconds += time.perf_counter() - start
+        return choice
+
+    def record_routing_call(self, seconds: float):
+        self.routing_calls += 1
+        self.routing_call_seconds += seconds
+
+    def report(self) -> str:
+        requests = self.stats["requests"]
+        if not requests:
+            return "pre-router: no requests yet"
+        skipped = self.stats["rule_routed"] + self.stats["embedding_routed"]
+        line = (f"pre-router: {skipped}/{requests} requests ({100 * skipped / requests:.0f}%) skipped the routing call "
+                f"[rules {self.stats['rule_routed']}, embeddings {self.stats['embedding_routed']}], "
+                f"avg pre-route {1000 * self.preroute_seconds / requests:.2f} ms")
+        if self.routing_calls:
+            avg_call = self.routing_call_seconds / self.routing_calls
+            line += f"; avg routing call {avg_call:.2f}s, ~{skipped * avg_call:.1f}s saved"
+        return line
+
+
+def create_prerouter(**agents: str) -> PreRouter:
+    """PreRouter for the given role=agent_name pairs, e.g. create_prerouter(billing="billing_agent", ...)."""
+    routes = {name: SUPPORT_ROUTES[role] for role, name in agents.items()}
+    classifier = None
+    model = os.getenv("PREROUTER_EMBEDDING_MODEL")
+    if model:
+        classifier = EmbeddingClassifier(
+            {name: route.examples for name, route in routes.items()}, gemini_embedder(model),
+            threshold=float(os.getenv("PREROUTER_EMBEDDING_THRESHOLD", "0.75")),
+        )
+    return PreRouter({name: route.patterns for name, route in routes.items()}, classifier)
+
+
+class PreRoutedAgent(BaseAgent):
+    """Runs the pre-router's pick directly, and the wrapped LLM router only when the pre-router is unsure.
+    The router is only referenced, not adopted as a sub-agent, so the caller can still use it on its own."""
+
+    router: BaseAgent
+    prerouter: PreRouter
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        parts = ctx.user_content.parts if ctx.user_content and ctx.user_content.parts else []
+        name = await self.prerouter.route(" ".join(part.text for part in parts if part.text))
+        agent = self.router.find_sub_agent(name) if name else None
+
+        if agent is not None:
+            async with aclosing(agent.run_async(ctx)) as events:
+                async for event in events:
+                    yield event
+            return
+
+        start, routed = time.perf_counter(), False
+        async with aclosing(self.router.run_async(ctx)) as events:
+            async for event in events:
+                if not routed and event.author != self.router.name:
+                    self.prerouter.record_routing_call(time.perf_counter() - start)  # router has handed off
+                    routed = True
+                yield event
+
+
+# --- Routing benchmark ---
+
+QUERIES = [
+    ("billing_agent", "I need to check my latest invoice. My email is bob@example.com."),
+    ("billing_agent", "Why was I charged twice?"),
+    ("technical_agent", "My app keeps crashing every time I try to login."),
+    ("technical_agent", "Everything is slow today, is there an outage?"),
+    ("shipping_agent", "Where is my package for order ORD-1004?"),
+    ("shipping_agent", "Has my delivery shipped yet?"),
+    ("billing_agent", "Can you help me with my account?"),  # no rule matches
+    ("technical_agent", "My invoice page shows an error"),  # two topics: left to the router
+]
+
+
+async def _benchmark(routing_ms: float, rounds: int):
+    from google.adk.agents import Agent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai import types
+    from sessions import AgentSessions
+
+    usage = types.GenerateContentResponseUsageMetadata(prompt_token_count=1, candidates_token_count=1)
+    labels = dict((query, name) for name, query in QUERIES)
+
+    class StubRouterLlm(BaseLlm):
+        """Takes `routing_ms` to decide, like a Gemini routing call, then transfers to the labelled agent."""
+        async def generate_content_async(self, llm_request, stream=False):
+            await asyncio.sleep(routing_ms / 1000)
+            query = llm_request.contents[-1].parts[0].text or ""
+            call = types.FunctionCall(name="transfer_to_agent", args={"agent_name": labels.get(query, "billing_agent")})
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]),
+                              usage_metadata=usage)
+
+    class StubSpecialistLlm(BaseLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="ok")]), usage_metadata=usage)
+
+    def build():
+        specialists = [Agent(name=name, model=StubSpecialistLlm(model="stub"), description=name)
+                       for name in ("billing_agent", "technical_agent", "shipping_agent")]
+        return Agent(name="router", model=StubRouterLlm(model="stub"), instruction="Route.", sub_agents=specialists)
+
+    prerouter = create_prerouter(billing="billing_agent", technical="technical_agent", shipping="shipping_agent")
+    agents = {"LLM router only": build(), "pre-router + LLM router": PreRoutedAgent(name="prerouted", router=build(),
+                                                                                       prerouter=prerouter)}
+    sessions = AgentSessions()
+    print(f"{'':26} {'avg ms/request':>15}")
+    for label, agent in agents.items():
+        start = time.perf_counter()
+        for i in range(rounds):
+            for j, (_, query) in enumerate(QUERIES):
+                await sessions.ask(agent, query, conversation_id=f"{label}-{i}-{j}")
+        print(f"{label:26} {1000 * (time.perf_counter() - start) / (rounds * len(QUERIES)):15.1f}")
+    print(prerouter.report())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Routing latency with and without the deterministic pre-router")
+    parser.add_argument("--routing-ms", type=float, default=800.0, help="Simulated duration of an LLM routing call")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(_benchmark(args.routing_ms, args.rounds))
@@ -0,0 +1,205 @@
+"""
+Long-lived runners and sessions for ADK agents.
+One Runner is kept per agent tree, and each conversation id maps to one ADK session that is reused across messages,
+so multi-turn conversations keep their history and runner setup is paid once instead of per message.
+Live sessions are bounded: the least recently used are forgotten once there are more than `max_sessions`,
+or once they have been idle longer than `idle_ttl`. Forgetting only drops the local entry; the history stays in the
+session service and is loaded again on the conversation's next message. A conversation with a message in flight is
+never evicted. Deleting old history from the backend is a separate, explicit retention step: delete_idle().
+
+Backends (ADK_SESSION_BACKEND):
+    memory  InMemorySessionService (default)
+    sqlite  DatabaseSessionService on ADK_SESSION_DB (needs `pip install "google-adk[db]"`); survives restarts
+
+Measure setup overhead (stub model, no API key needed):
+    python sessions.py --calls 200
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict
+from contextlib import aclosing
+from typing import AsyncGenerator
+
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.genai import types
+
+
+class AgentSessions:
+    """Warm Runner per agent tree plus an LRU of live sessions keyed by (agent, user, conversation)."""
+
+    def __init__(self, session_service: BaseSessionService = None, max_sessions: int = 1000, idle_ttl: float = 1800.0):
+        self.session_service = session_service or InMemorySessionService()
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._runners = {}  # agent name -> Runner
+        self._sessions = OrderedDict()  # (app_name, user_id, conversation_id) -> last used (monotonic)
+        self._opening = {}  # key -> asyncio.Lock, while a conversation's session is being loaded or created
+        self._active = Counter()  # key -> messages running in that conversation
+        self.stats = {"runners_created": 0, "sessions_created": 0, "sessions_resumed": 0, "sessions_evicted": 0}
+
+    def runner(self, agent) -> Runner:
+        """The Runner for this agent tree; rebuilt only if a different agent object takes the same name."""
+        runner = self._runners.get(agent.name)
+        if runner is None or runner.agent is not agent:
+            runner = Runner(agent=agent, app_name=agent.name, session_service=self.session_service)
+            self._runners[agent.name] = runner
+            self.stats["runners_created"] += 1
+        return runner
+
+    async def session_id(self, runner: Runner, user_id: str, conversation_id: str) -> str:
+        """Session for a conversation: reused while live, loaded from the backend, or created."""
+        key = (runner.app_name, user_id, conversation_id)
+        if key not in self._sessions:
+            # One opener per conversation, or two first messages would both create the same session
+            async with self._opening.setdefault(key, asyncio.Lock()):
+                if key not in self._sessions:
+                    await self._open(runner.app_name, user_id, conversation_id)
+                    self._sessions[key] = time.monotonic()
+                self._opening.pop(key, None)
+        now = time.monotonic()
+        self._sessions[key] = now
+        self._sessions.move_to_end(key)
+        self._evict(now)
+        return conversation_id
+
+    async def _open(self, app_name: str, user_id: str, session_id: str):
+        session = await self.session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        if session is None:
+            await self.session_service.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
+            self.stats["sessions_created"] += 1
+        else:
+            self.stats["sessions_resumed"] += 1
+
+    def _evict(self, now: float):
+        """Forget the least recently used conversations; their history stays in the session service."""
+        for _ in range(len(self._sessions)):
+            key, last_used = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - last_used < self.idle_ttl:
+                break
+            if self._active[key]:  # a message is still running in it, so it isn't idle
+                self._sessions[key] = now
+                self._sessions.move_to_end(key)
+                continue
+            del self._sessions[key]
+            self.stats["sessions_evicted"] += 1
+
+    async def delete_idle(self, app_name: str, max_age: float, user_id: str = None) -> int:
+        """Retention: delete this app's sessions not updated for max_age seconds from the backend; returns the count.
+        Nothing calls this implicitly. Run it from a scheduled job if old conversations should expire."""
+        cutoff = time.time() - max_age
+        response = await self.session_service.list_sessions(app_name=app_name, user_id=user_id)
+        deleted = 0
+        for session in response.sessions:
+            key = (session.app_name, session.user_id, session.id)
+            if session.last_update_time >= cutoff or self._active[key]:
+                continue
+            await self.session_service.delete_session(
+                app_name=session.app_name, user_id=session.user_id, session_id=session.id
+            )
+            self._sessions.pop(key, None)
+            deleted += 1
+        return deleted
+
+    async def run(self, agent, message: str, conversation_id: str = "default", user_id: str = "user1") -> AsyncGenerator:
+        """Send a message in a conversation and yield the agent's events."""
+        runner = self.runner(agent)
+        key = (runner.app_name, user_id, conversation_id)
+        self._active[key] += 1
+        try:
+            session_id = await self.session_id(runner, user_id, conversation_id)
+            content = types.Content(role="user", parts=[types.Part(text=message)])
+            async with aclosing(runner.run_async(user_id=user_id, session_id=session_id, new_message=content)) as events:
+                async for event in events:
+                    yield event
+        finally:
+            self._active[key] -= 1
+            if not self._active[key]:
+                del self._active[key]
+
+    async def ask(self, agent, message: str, conversation_id: str = "default", user_id: str = "user1") -> str:
+        """Final text response for a message in a conversation (the last one, for agents that answer in steps)."""
+        final = "(no response)"
+        async with aclosing(self.run(agent, message, conversation_id, user_id)) as events:
+            async for event in events:
+                if event.is_final_response() and event.content and event.content.parts and event.content.parts[0].text:
+                    final = event.content.parts[0].text
+        return final
+
+
+def create_session_service() -> BaseSessionService:
+    if os.getenv("ADK_SESSION_BACKEND", "memory").lower() == "sqlite":
+        from google.adk.sessions import DatabaseSessionService
+        return DatabaseSessionService(db_url=f"sqlite+aiosqlite:///{os.getenv('ADK_SESSION_DB', 'adk_sessions.db')}")
+    return InMemorySessionService()
+
+
+def create_agent_sessions() -> AgentSessions:
+    """Build from ADK_SESSION_BACKEND, ADK_MAX_SESSIONS (default 1000) and ADK_SESSION_IDLE_SECONDS (default 1800)."""
+    return AgentSessions(
+        create_session_service(),
+        max_sessions=int(os.getenv("ADK_MAX_SESSIONS", "1000")),
+        idle_ttl=float(os.getenv("ADK_SESSION_IDLE_SECONDS", "1800")),
+    )
+
+
+# --- Setup overhead benchmark ---
+
+async def _benchmark(calls: int):
+    from google.adk.agents import Agent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+
+    class StubLlm(BaseLlm):
+        """Answers instantly so only runner/session overhead is measured."""
+        async def generate_content_async(self, llm_request, stream=False):
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text="ok")]),
+                usage_metadata=types.GenerateContentResponseUsageMetadata(prompt_token_count=1, candidates_token_count=1),
+            )
+
+    agent = Agent(name="benchmark_agent", model=StubLlm(model="stub"), instruction="Reply ok.")
+    content = types.Content(role="user", parts=[types.Part(text="hello")])
+
+    async def per_call_setup():
+        # What ask() used to do before every message
+        service = InMemorySessionService()
+        runner = Runner(agent=agent, app_name="demo", session_service=service)
+        session = await service.create_session(app_name="demo", user_id="user1")
+        return runner, session.id
+
+    async def pooled_setup(i: int):
+        runner = sessions.runner(agent)
+        return runner, await sessions.session_id(runner, "user1", f"c{i}")
+
+    async def timed(setup, calls: int) -> tuple:
+        setup_time = total_time = 0.0
+        for i in range(calls):
+            start = time.perf_counter()
+            runner, session_id = await setup(i)
+            setup_time += time.perf_counter() - start
+            async for _ in runner.run_async(user_id="user1", session_id=session_id, new_message=content):
+                pass
+            total_time += time.perf_counter() - start
+        return 1000 * setup_time / calls, 1000 * total_time / calls
+
+    sessions = create_agent_sessions()
+    await timed(lambda i: per_call_setup(), 5)  # warm imports and caches
+    print(f"{'':34} {'setup ms':>10} {'total ms':>10}")
+    for name, setup, calls in [
+        ("per-call runner + session", lambda i: per_call_setup(), calls),
+        ("warm runner, new conversations", pooled_setup, calls),
+        ("warm runner + session, same chat", lambda i: pooled_setup(-1), calls),
+    ]:
+        setup_ms, total_ms = await timed(setup, calls)
+        print(f"{name:34} {setup_ms:10.3f} {total_ms:10.3f}")
+    print(f"stats: {sessions.stats}")
+    print("The same-chat total grows with history: every turn sends the whole conversation to the model.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-call vs pooled ADK runner/session setup")
+    parser.add_argument("--calls", type=int, default=200)
+    asyncio.run(_benchmark(parser.parse_args().calls))
@@ -1,51 +1,84 @@
 """
 Shipping Agent -- Exposed via A2A Protocol
 Run: uvicorn shipping_agent:app --port 8001
+Scaled: python shipping_agent.py --workers 4 --port 8001
+        (/healthz, /readyz and /metrics per worker; agent calls beyond the concurrency limit queue, then get 429)
 """
 
+import argparse
 import os
 from dotenv import load_dotenv
 from google.adk.agents import Agent
 from google.adk.a2a.utils.agent_to_a2a import to_a2a
+from cassette import cassette_model
+from order_store import create_order_store
+from a2a_service import AgentCardETagMiddleware, scale
 
 load_dotenv()
 
 # --- Tools ---
 
+# Indexed order store with an LRU of hot orders in front (ORDER_STORE / ORDER_DB, see order_store.py)
+orders = create_order_store()
+
+def _shipping(order: dict) -> dict:
+    return {"carrier": order["carrier"], "tracking": order["tracking"], "status": order["status"], "location": order["location"]}
+
 def get_shipping_status(order_id: str) -> dict:
     """Get current shipping status for an order."""
-    data = {
-        "ORD-1001": {"carrier": "FedEx", "tracking": "FX-789456123", "status": "in_transit", "location": "Memphis, TN"},
-        "ORD-1002": {"carrier": "UPS", "tracking": "1Z999AA10123456784", "status": "delivered", "location": "Customer doorstep"},
-        "ORD-1003": {"carrier": "USPS", "tracking": "9400111899223100001234", "status": "processing", "location": "Warehouse"},
-        "ORD-1004": {"carrier": "DHL", "tracking": "DHL-5678901234", "status": "out_for_delivery", "location": "Local facility"},
-        "ORD-1005": {"carrier": "FedEx", "tracking": "FX-321654987", "status": "in_transit", "location": "Chicago, IL"},
+    order = orders.get(order_id.strip().upper())
+    return _shipping(order) if order else {"error": f"No shipping info for {order_id}"}
+
+def get_shipping_status_many(order_ids: list[str]) -> dict:
+    """Get current shipping status for several orders at once, keyed by order ID."""
+    found = orders.get_many([order_id.strip().upper() for order_id in order_ids])
+    return {
+        order_id: _shipping(found[key]) if key in found else {"error": f"No shipping info for {order_id}"}
+        for order_id, key in ((order_id, order_id.strip().upper()) for order_id in order_ids)
     }
-    return data.get(order_id, {"error": f"No shipping info for {order_id}"})
 
 def get_estimated_delivery(order_id: str) -> dict:
     """Get estimated delivery date for an order."""
-    estimates = {
-        "ORD-1001": {"date": "2026-02-14", "window": "9 AM - 5 PM", "note": "Signature required"},
-        "ORD-1002": {"date": "2026-02-11", "window": "Delivered", "note": "Left at front door"},
-        "ORD-1003": {"date": "2026-02-18", "window": "TBD", "note": "Still processing"},
-        "ORD-1004": {"date": "2026-02-13", "window": "12 - 4 PM", "note": "Out for delivery today"},
-        "ORD-1005": {"date": "2026-02-15", "window": "10 AM - 6 PM", "note": "Standard delivery"},
-    }
-    return estimates.get(order_id, {"error": f"No estimate for {order_id}"})
+    order = orders.get(order_id.strip().upper())
+    if not order:
+        return {"error": f"No estimate for {order_id}"}
+    return {"date": order["est_date"], "window": order["est_window"], "note": order["est_note"]}
 
 # --- Agent ---
 
 shipping_agent = Agent(
     name="shipping_status_agent",
-    model=os.getenv("GEMINI_MODEL", "gemini-2.5-flash"),
+    model=cassette_model(os.getenv("GEMINI_MODEL", "gemini-2.5-flash")),
     description="Handles shipping and delivery questions.",
-    instruction="You are a shipping specialist. Use get_shipping_status and get_estimated_delivery to help customers track packages.",
-    tools=[get_shipping_status, get_estimated_delivery],
+    instruction="You are a shipping specialist. Use get_shipping_status and get_estimated_delivery to help customers track packages. "
+                "For several orders at once, use get_shipping_status_many.",
+    tools=[get_shipping_status, get_shipping_status_many, get_estimated_delivery],
 )
 
 # --- A2A ---
 
-app = to_a2a(shipping_agent, port=8001)
+a2a_app = to_a2a(shipping_agent, port=int(os.getenv("SHIPPING_AGENT_PORT", "8001")))
+a2a_app.add_middleware(AgentCardETagMiddleware)  # callers revalidate their cached card with If-None-Match
+
+# Per worker: latency metrics, at most SHIPPING_MAX_CONCURRENT agent calls at once, SHIPPING_MAX_QUEUE waiting,
+# and health checks that never touch the model (see a2a_service.py)
+app = scale(
+    a2a_app,
+    ready_checks={"order_store": orders.ping},
+    max_concurrent=int(os.getenv("SHIPPING_MAX_CONCURRENT", "8")),
+    max_queue=int(os.getenv("SHIPPING_MAX_QUEUE", "32")),
+    queue_timeout=float(os.getenv("SHIPPING_QUEUE_TIMEOUT_SECONDS", "10")),
+)
 
 # Run with: uvicorn shipping_agent:app --port 8001
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the shipping agent over A2A with several worker processes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SHIPPING_AGENT_PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SHIPPING_WORKERS", "2")))
+    args = parser.parse_args()
+    os.environ["SHIPPING_AGENT_PORT"] = str(args.port)  # workers re-import this module; the card must advertise this port
+    uvicorn.run("shipping_agent:app", host=args.host, port=args.port, workers=args.workers)
@@ -7,10 +7,9 @@ Run:
 """
 
 import streamlit as st
-import asyncio
-import concurrent.futures
 import os
 import sys
+import uuid
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -18,14 +17,33 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from google.adk.agents import Agent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
-
-MODEL = "gemini-2.5-flash"
+from cassette import cassette_model
+from sessions import create_agent_sessions
+from background_loop import BackgroundLoop
+from mcp_pool import McpPool
+from mcp_schema_cache import create_schema_cache
+from fanout import FanOutRouter
+from prerouter import PreRoutedAgent, create_prerouter
+from a2a_client import create_a2a_pool
+from tool_cache import create_tool_cache
+from kb_search import create_knowledge_base
+
+MODEL = cassette_model("gemini-2.5-flash")  # LLM_CASSETTE=record|replay|auto, see cassette.py
+SHIPPING_AGENT_URL = "http://localhost:8001"
 
 # --- Tools ---
 
+@st.cache_resource
+def get_tool_cache():
+    """Results of the lookup tools, shared across reruns and browser sessions (see tool_cache.py)."""
+    return create_tool_cache()
+
+@st.cache_resource
+def get_knowledge_base():
+    """BM25 index over knowledge_base/*.md, opened once and kept in sync with the articles (see kb_search.py)."""
+    return create_knowledge_base()
+
+@get_tool_cache().memoize(ttl=120)
 def lookup_invoice(customer_email: str) -> dict:
     """Look up the most recent invoice for a customer by email."""
     invoices = {
@@ -39,18 +57,15 @@ def process_refund(invoice_id: str, reason: str) -> dict:
     """Process a refund for a specific invoice."""
     return {"refund_id": f"REF-{invoice_id[-3:]}", "status": "approved", "message": f"Refund for {invoice_id} approved. 5-7 business days."}
 
-def search_knowledge_base(query: str) -> dict:
-    """Search the knowledge base for technical solutions."""
-    articles = {
-        "login": {"title": "Login Issues", "solution": "1. Clear cache. 2. Try incognito. 3. Reset password."},
-        "crash": {"title": "App Crashing", "solution": "1. Update to v3.2.1. 2. Clear app data. 3. Check OS requirements."},
-        "slow": {"title": "Performance Issues", "solution": "1. Check internet. 2. Close other apps. 3. Enable hardware acceleration."},
-    }
-    for keyword, article in articles.items():
-        if keyword in query.lower():
-            return article
-    return {"title": "General Support", "solution": "No specific article found."}
+@get_tool_cache().memoize(ttl=300)  # articles can be edited; the index picks changes up within KB_SYNC_SECONDS
+async def search_knowledge_base(query: str) -> dict:
+    """Search the knowledge base for technical solutions. Returns the best-matching articles, best first."""
+    results = await get_knowledge_base().asearch(query, k=3)  # index I/O runs on a worker thread
+    if not results:
+        return {"results": [], "message": "No specific article found. Contact support."}
+    return {"results": results}
 
+@get_tool_cache().memoize(ttl=15)
 def check_system_status() -> dict:
     """Check current status of all platform services."""
     return {"overall": "operational", "auth_service": "degraded", "last_incident": "2026-02-08"}
@@ -62,44 +77,73 @@ def create_escalation_ticket(customer_email: str, issue_summary: str, priority:
 
 # --- Demo 1 Agents ---
 
-billing_agent = Agent(
-    name="billing_agent", model=MODEL,
-    description="Handles billing: invoices, payments, refunds.",
-    instruction="You are a billing specialist. Use lookup_invoice and process_refund.",
-    tools=[lookup_invoice, process_refund],
-)
-technical_agent = Agent(
-    name="technical_agent", model=MODEL,
-    description="Handles technical issues: bugs, crashes, performance.",
-    instruction="You are a technical specialist. Use search_knowledge_base and check_system_status.",
-    tools=[search_knowledge_base, check_system_status],
-)
-escalation_agent = Agent(
-    name="escalation_agent", model=MODEL,
-    description="Handles complaints, disputes, security concerns.",
-    instruction="You are an escalation specialist. Use create_escalation_ticket.",
-    tools=[create_escalation_ticket],
-)
-router_agent = Agent(
-    name="customer_support_router", model=MODEL,
-    instruction="Route to billing_agent, technical_agent, or escalation_agent. Never answer directly.",
-    sub_agents=[billing_agent, technical_agent, escalation_agent],
-)
+@st.cache_resource
+def get_router_agent():
+    """Demo 1 router and specialists, built once so both paths share one agent tree and one warm Runner."""
+    billing_agent = Agent(
+        name="billing_agent", model=MODEL,
+        description="Handles billing: invoices, payments, refunds.",
+        instruction="You are a billing specialist. Use lookup_invoice and process_refund.",
+        tools=[lookup_invoice, process_refund],
+    )
+    technical_agent = Agent(
+        name="technical_agent", model=MODEL,
+        description="Handles technical issues: bugs, crashes, performance.",
+        instruction="You are a technical specialist. Use search_knowledge_base and check_system_status.",
+        tools=[search_knowledge_base, check_system_status],
+    )
+    escalation_agent = Agent(
+        name="escalation_agent", model=MODEL,
+        description="Handles complaints, disputes, security concerns.",
+        instruction="You are an escalation specialist. Use create_escalation_ticket.",
+        tools=[create_escalation_ticket],
+    )
+    return Agent(
+        name="customer_support_router", model=MODEL,
+        instruction="Route to billing_agent, technical_agent, or escalation_agent. Never answer directly.",
+        sub_agents=[billing_agent, technical_agent, escalation_agent],
+    )
+
+@st.cache_resource
+def get_prerouted_agent():
+    """The Demo 1 router behind the deterministic fast path (see prerouter.py); cached so its stats span reruns."""
+    return PreRoutedAgent(name="customer_support", router=get_router_agent(), prerouter=create_prerouter(
+        billing="billing_agent", technical="technical_agent", escalation="escalation_agent"))
 
 # --- Demo 2 & 3 Agent Factories ---
 
-def create_mcp_billing_agent():
-    from google.adk.tools.mcp_tool import McpToolset, StdioConnectionParams
+@st.cache_resource
+def get_mcp_pool():
+    """MCP servers shared by every agent and rerun; started once and kept warm (see mcp_pool.py)."""
+    return McpPool(idle_timeout=float(os.getenv("MCP_IDLE_SECONDS", "600")), schema_cache=create_schema_cache())
+
+@st.cache_resource
+def supabase_mcp_toolset():
+    """The pooled Supabase MCP toolset, started in the background so the first query doesn't wait for npx."""
+    from google.adk.tools.mcp_tool import StdioConnectionParams
     from mcp.client.stdio import StdioServerParameters
     token = os.getenv("SUPABASE_ACCESS_TOKEN", "")
     ref = os.getenv("SUPABASE_PROJECT_REF", "")
     if not token:
-        return None, "SUPABASE_ACCESS_TOKEN not set in .env"
+        return None
     mcp_args = ["-y", "@supabase/mcp-server-supabase@latest", "--access-token", token]
     if ref:
         mcp_args += ["--project-ref", ref]
-    mcp = McpToolset(connection_params=StdioConnectionParams(
+    toolset = get_mcp_pool().toolset("supabase", StdioConnectionParams(
         server_params=StdioServerParameters(command="npx", args=mcp_args), timeout=30.0))
+    get_background_loop().submit(toolset.start())
+    return toolset
+
+@st.cache_resource
+def get_a2a_pool():
+    """Keep-alive connection, circuit breaker and cached agent card for the shipping agent (see a2a_client.py)."""
+    return create_a2a_pool()
+
+@st.cache_resource
+def create_mcp_billing_agent():
+    mcp = supabase_mcp_toolset()
+    if mcp is None:
+        return None, "SUPABASE_ACCESS_TOKEN not set in .env"
     agent = Agent(
         name="billing_agent_mcp", model=MODEL,
         description="Billing agent with real Supabase database access via MCP.",
@@ -107,42 +151,53 @@ def create_mcp_billing_agent():
         tools=[mcp])
     return agent, None
 
-def create_full_system_agent():
-    from google.adk.tools.mcp_tool import McpToolset, StdioConnectionParams
-    from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
-    from mcp.client.stdio import StdioServerParameters
-    token = os.getenv("SUPABASE_ACCESS_TOKEN", "")
-    ref = os.getenv("SUPABASE_PROJECT_REF", "")
-    if not token:
+@st.cache_resource
+def create_full_system_agent(fan_out=False):
+    mcp = supabase_mcp_toolset()
+    if mcp is None:
         return None, "SUPABASE_ACCESS_TOKEN not set in .env"
-    mcp_args = ["-y", "@supabase/mcp-server-supabase@latest", "--access-token", token]
-    if ref:
-        mcp_args += ["--project-ref", ref]
-    mcp = McpToolset(connection_params=StdioConnectionParams(
-        server_params=StdioServerParameters(command="npx", args=mcp_args), timeout=30.0))
     billing = Agent(name="billing_agent_mcp", model=MODEL,
         description="Billing with real Supabase DB via MCP.", instruction="Use MCP tools to query the database.", tools=[mcp])
     tech = Agent(name="technical_agent", model=MODEL,
         description="Technical issues: bugs, crashes, performance.", instruction="Use search_knowledge_base and check_system_status.",
         tools=[search_knowledge_base, check_system_status])
-    shipping = RemoteA2aAgent(name="shipping_agent", agent_card="http://localhost:8001",
-        description="Remote agent for shipping and delivery tracking.")
+    shipping = get_a2a_pool().remote_agent("shipping_agent", SHIPPING_AGENT_URL,
+        "Remote agent for shipping and delivery tracking.")
+    if fan_out:
+        # Multi-part queries: specialists answer concurrently; a slow A2A shipping call doesn't hold back the rest
+        return FanOutRouter(name="full_support_fanout", model=MODEL, branch_timeout=60.0,
+            branch_timeouts={"shipping_agent": 20.0}, sub_agents=[billing, tech, shipping]), None
     root = Agent(name="full_support_system", model=MODEL,
         instruction="Route to billing_agent_mcp, technical_agent, or shipping_agent. Never answer directly.",
         sub_agents=[billing, tech, shipping])
-    return root, None
+    # Obvious queries skip the routing call (see prerouter.py)
+    return PreRoutedAgent(name="full_support", router=root, prerouter=create_prerouter(
+        billing="billing_agent_mcp", technical="technical_agent", shipping="shipping_agent")), None
 
 # --- Runner ---
 
+@st.cache_resource
+def get_agent_sessions():
+    """Warm runners and bounded session storage shared across reruns and browser sessions (see sessions.py)."""
+    return create_agent_sessions()
+
+def get_conversation_id():
+    """One ADK conversation per browser session, so follow-up questions keep their context."""
+    if "conversation_id" not in st.session_state:
+        st.session_state["conversation_id"] = uuid.uuid4().hex
+    return st.session_state["conversation_id"]
+
+@st.cache_resource
+def get_background_loop():
+    """One event loop thread for the whole app; agent runs from every rerun and browser session share it."""
+    return BackgroundLoop()
+
 def run_agent_sync(agent, message, timeout=120):
-    """Run an ADK agent synchronously with trace capture."""
+    """Run an ADK agent synchronously with trace capture, on the app's persistent event loop."""
+    sessions, conversation_id = get_agent_sessions(), get_conversation_id()
     async def _run():
-        service = InMemorySessionService()
-        runner = Runner(agent=agent, app_name="demo", session_service=service)
-        session = await service.create_session(app_name="demo", user_id="user1")
-        content = types.Content(role="user", parts=[types.Part(text=message)])
         trace, final = [], "(no response)"
-        async for event in runner.run_async(user_id="user1", session_id=session.id, new_message=content):
+        async for event in sessions.run(agent, message, conversation_id=conversation_id):
             author = getattr(event, "author", "unknown")
             if event.content and event.content.parts:
                 for part in event.content.parts:
@@ -152,22 +207,22 @@ def run_agent_sync(agent, message, timeout=120):
                     if fc:
                         trace.append({"author": author, "type": "tool_call", "tool": fc.name, "args": dict(fc.args) if fc.args else {}})
                     elif fr:
-                        trace.append({"author": author, "type": "tool_response", "tool": fr.name, "result": str(fr.response)[:800] if fr.response else ""})
+                        trace.append({"author": author, "type": "tool_response", "tool": fr.name, "result": str(fr.response)[:800] if fr.response else "",
+                                      "cached": get_tool_cache().was_hit(fr.id)})
                     elif text:
                         trace.append({"author": author, "type": "text", "text": text})
                         if event.is_final_response():
                             final = text
         return final, trace
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-        return pool.submit(asyncio.run, _run()).result(timeout=timeout)
+    return get_background_loop().run(_run(), timeout=timeout)
 
 # --- Helpers ---
 
-def check_shipping_agent(url="http://localhost:8001"):
+def check_shipping_agent(url=SHIPPING_AGENT_URL):
+    """Card fetched through the A2A pool: cached across reruns, and skipped while the circuit is open."""
     try:
-        import urllib.request
-        with urllib.request.urlopen(f"{url}/.well-known/agent-card.json", timeout=2) as r:
-            return r.status == 200
+        get_background_loop().run(get_a2a_pool().card(url), timeout=3)
+        return get_a2a_pool().breaker(url).state != "open"
     except Exception:
         return False
 
@@ -185,7 +240,8 @@ def render_trace(trace):
             args = ", ".join(f"{k}={v!r}" for k, v in step.get("args", {}).items())
             st.warning(f"**{i+1}.** `{author}` called **{step['tool']}**({args[:200]})")
         elif step["type"] == "tool_response":
-            st.success(f"**{i+1}.** `{author}` got result from **{step['tool']}**")
+            source = "cached result" if step.get("cached") else "result"
+            st.success(f"**{i+1}.** `{author}` got {source} from **{step['tool']}**")
             if step.get("result"):
                 st.code(step["result"][:500], language="json")
         elif step["type"] == "text" and step.get("text", "").strip():
@@ -200,6 +256,7 @@ api_key = os.getenv("GOOGLE_API_KEY")
 supa_token = os.getenv("SUPABASE_ACCESS_TOKEN")
 supa_ref = os.getenv("SUPABASE_PROJECT_REF")
 shipping_ok = check_shipping_agent()
+supabase_mcp_toolset()  # starts the MCP server at launch, while the user is still reading the page
 
 # --- Sidebar ---
 
@@ -317,6 +374,7 @@ elif page == "Demo 1: Routing":
         if st.button("Escalation Query", use_container_width=True):
             query = "Someone hacked my account! Email: jane@example.com. Urgent!"
     custom = st.text_input("Or type your own:", placeholder="e.g. What's the status of my refund?")
+    fast_path = st.toggle("Fast-path pre-router: obvious queries skip the routing call", value=True, key="d1f")
     if st.button("Send", type="primary") and custom.strip():
         query = custom.strip()
 
@@ -324,7 +382,7 @@ elif page == "Demo 1: Routing":
         st.markdown(f"**Query:** {query}")
         with st.spinner("Running..."):
             try:
-                response, trace = run_agent_sync(router_agent, query)
+                response, trace = run_agent_sync(get_prerouted_agent() if fast_path else get_router_agent(), query)
                 st.session_state["d1_resp"], st.session_state["d1_trace"], st.session_state["d1_q"] = response, trace, query
             except Exception as e:
                 st.error(str(e))
@@ -334,6 +392,8 @@ elif page == "Demo 1: Routing":
         st.markdown(f"**Query:** {st.session_state.get('d1_q', '')}")
         st.subheader("Response")
         st.markdown(st.session_state["d1_resp"])
+        st.caption(get_prerouted_agent().prerouter.report())
+        st.caption(get_tool_cache().report())
         with st.expander("Agent Trace", expanded=True):
             render_trace(st.session_state.get("d1_trace", []))
 
@@ -366,7 +426,7 @@ elif page == "Demo 2: MCP + Database":
 
     if query:
         st.markdown(f"**Query:** {query}")
-        with st.spinner("Connecting to MCP + Supabase (may take 10-15s)..."):
+        with st.spinner("Querying Supabase via MCP..."):
             try:
                 agent, err = create_mcp_billing_agent()
                 if err:
@@ -418,6 +478,7 @@ elif page == "Demo 3: Full System":
         if st.button("Shipping (A2A)", use_container_width=True):
             query = "Where is my package for order ORD-1004?"
     custom = st.text_input("Or type your own:", key="d3c", placeholder="e.g. Help with my order and a tech issue")
+    fan_out = st.toggle("Fan-out mode: answer every part of a multi-part question in parallel", key="d3f")
     if st.button("Send", key="d3s", type="primary") and custom.strip():
         query = custom.strip()
 
@@ -425,7 +486,7 @@ elif page == "Demo 3: Full System":
         st.markdown(f"**Query:** {query}")
         with st.spinner("Running full system (15-20s)..."):
             try:
-                agent, err = create_full_system_agent()
+                agent, err = create_full_system_agent(fan_out=fan_out)
                 if err:
                     st.error(err)
                 else:
@@ -439,5 +500,9 @@ elif page == "Demo 3: Full System":
         st.markdown(f"**Query:** {st.session_state.get('d3_q', '')}")
         st.subheader("Response")
         st.markdown(st.session_state["d3_resp"])
+        agent, _ = create_full_system_agent()
+        if agent is not None:
+            st.caption(agent.prerouter.report())
+        st.caption(get_tool_cache().report())
         with st.expander("Agent Trace", expanded=True):
             render_trace(st.session_state.get("d3_trace", []))
@@ -0,0 +1,164 @@
+"""
+Memoized ADK function tools.
+The model often repeats a lookup within a conversation (the same invoice, the same knowledge base article, the system
+status before and after a transfer). ToolResultCache.memoize turns a pure lookup function into a FunctionTool that
+Agent(tools=[...]) takes as usual, and answers repeated calls with the same arguments from a bounded LRU:
+
+    tool_cache = create_tool_cache()
+
+    @tool_cache.memoize(ttl=60)
+    def check_system_status() -> dict: ...
+
+Each tool has its own TTL: short for live data such as system status, long for knowledge base articles.
+Only memoize lookups. Tools with side effects (process_refund, create_escalation_ticket) must run every time.
+Results that carry an "error" key (validation failures, not-found answers) are not cached.
+
+Cache hits are remembered by function call id, so a trace can mark them: tool_cache.was_hit(function_response.id).
+TOOL_CACHE_SIZE (default 1024) bounds the number of entries; TOOL_CACHE=off disables memoization.
+
+Measure a slow tool called repeatedly by a stub model (no API key needed):
+    python tool_cache.py --tool-ms 300
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from google.adk.tools import FunctionTool, ToolContext
+
+
+class MemoizedTool(FunctionTool):
+    """FunctionTool whose results are kept in a ToolResultCache for `ttl` seconds, per arguments."""
+
+    def __init__(self, func: Callable, cache: "ToolResultCache", ttl: float):
+        super().__init__(func)
+        self.cache = cache
+        self.ttl = ttl
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        key = (self.name, json.dumps(args, sort_keys=True, default=str))
+        hit, result = self.cache.get(key)
+        if hit:
+            self.cache.mark_hit(self.name, tool_context.function_call_id)
+            return copy.deepcopy(result)  # callers may mutate the dict they get back
+        result = await super().run_async(args=args, tool_context=tool_context)
+        self.cache.stats.setdefault(self.name, {"hits": 0, "misses": 0})["misses"] += 1
+        if not (isinstance(result, dict) and "error" in result):
+            self.cache.put(key, copy.deepcopy(result), self.ttl)
+        return result
+
+
+class ToolResultCache:
+    """LRU of tool results shared by every memoized tool; entries expire after their tool's TTL."""
+
+    def __init__(self, maxsize: int = 1024, enabled: bool = True, max_hit_ids: int = 10000):
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.max_hit_ids = max_hit_ids
+        self._entries = OrderedDict()  # (tool, args json) -> (result, expires at)
+        self._hit_ids = OrderedDict()  # function call id -> tool name, newest last
+        self.stats = {}  # tool name -> {"hits", "misses"}
+
+    def memoize(self, func: Callable = None, *, ttl: float = 300.0):
+        """Decorator: @cache.memoize(ttl=60) or cache.memoize(func, ttl=60). Returns the function as-is when disabled."""
+        if func is None:
+            return lambda f: self.memoize(f, ttl=ttl)
+        return MemoizedTool(func, self, ttl) if self.enabled else func
+
+    def get(self, key) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[1] < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[0]
+
+    def put(self, key, result: Any, ttl: float):
+        self._entries[key] = (result, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def mark_hit(self, tool: str, function_call_id: str):
+        self.stats.setdefault(tool, {"hits": 0, "misses": 0})["hits"] += 1
+        if function_call_id:
+            self._hit_ids[function_call_id] = tool
+            while len(self._hit_ids) > self.max_hit_ids:
+                self._hit_ids.popitem(last=False)
+
+    def was_hit(self, function_call_id: str) -> bool:
+        """Whether the tool call with this id was answered from the cache."""
+        return function_call_id in self._hit_ids
+
+    def clear(self):
+        self._entries.clear()
+
+    def report(self) -> str:
+        if not self.stats:
+            return "tool cache: no memoized calls yet"
+        hits = sum(s["hits"] for s in self.stats.values())
+        calls = hits + sum(s["misses"] for s in self.stats.values())
+        per_tool = ", ".join(f"{name} {s['hits']}/{s['hits'] + s['misses']}" for name, s in self.stats.items())
+        return f"tool cache: {hits}/{calls} calls ({100 * hits / calls:.0f}%) served from cache [{per_tool}]"
+
+
+def create_tool_cache() -> ToolResultCache:
+    """Build from TOOL_CACHE ("off" disables it) and TOOL_CACHE_SIZE."""
+    return ToolResultCache(
+        maxsize=int(os.getenv("TOOL_CACHE_SIZE", "1024")),
+        enabled=os.getenv("TOOL_CACHE", "on").lower() != "off",
+    )
+
+
+# --- Repeated tool call benchmark ---
+
+async def _benchmark(tool_ms: float, turns: int):
+    from google.adk.agents import Agent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai import types
+    from sessions import AgentSessions
+
+    usage = types.GenerateContentResponseUsageMetadata(prompt_token_count=1, candidates_token_count=1)
+
+    class StubLlm(BaseLlm):
+        """Calls check_system_status once per user turn, then answers, like a technical agent re-checking status."""
+        async def generate_content_async(self, llm_request, stream=False):
+            last = llm_request.contents[-1].parts[0]
+            if last.function_response:
+                part = types.Part(text=f"status: {last.function_response.response['overall']}")
+            else:
+                part = types.Part(function_call=types.FunctionCall(name="check_system_status", args={}))
+            yield LlmResponse(content=types.Content(role="model", parts=[part]), usage_metadata=usage)
+
+    def check_system_status() -> dict:
+        """Check current status of all platform services."""
+        time.sleep(tool_ms / 1000)  # a status API round trip
+        return {"overall": "operational"}
+
+    cache = ToolResultCache()
+    tools = {"plain": check_system_status, "memoized": cache.memoize(check_system_status, ttl=60)}
+    sessions = AgentSessions()
+    print(f"{'':10} {'avg ms/turn':>12}")
+    for label, tool in tools.items():
+        agent = Agent(name=f"technical_{label}", model=StubLlm(model="stub"), instruction="Help.", tools=[tool])
+        start = time.perf_counter()
+        for i in range(turns):
+            await sessions.ask(agent, f"Is everything up? ({i})", conversation_id=label)
+        print(f"{label:10} {1000 * (time.perf_counter() - start) / turns:12.1f}")
+    print(cache.report())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repeated tool calls with and without memoization")
+    parser.add_argument("--tool-ms", type=float, default=300.0, help="Simulated duration of one tool call")
+    parser.add_argument("--turns", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(_benchmark(args.tool_ms, args.turns))
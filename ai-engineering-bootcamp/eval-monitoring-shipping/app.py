@@ -6,7 +6,8 @@ Deploy this to Streamlit Cloud
 """
 
 import streamlit as st
-import requests
+import httpx
+import json
 import uuid
 
 st.set_page_config(
@@ -22,6 +23,51 @@ st.caption("Ask me anything and I'll research it for you!")
 # For local testing, you can use: API_URL = "http://localhost:8000"
 API_URL = st.secrets.get("API_URL", "http://localhost:8000")
 
+
+@st.cache_resource
+def get_http_client() -> httpx.Client:
+    """
+    One pooled keep-alive client shared by every session and rerun of this Streamlit server.
+    Reusing it avoids a new TCP (and TLS) handshake per message.
+    """
+    return httpx.Client(
+        base_url=API_URL,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+    )
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def get_health():
+    """Backend health, cached for a few seconds so reruns don't probe the API every time."""
+    try:
+        response = get_http_client().get("/health", timeout=5)
+        if response.status_code != 200:
+            return {"online": True, "ok": False}
+        return {"online": True, "ok": True, **response.json()}
+    except (ValueError, TypeError):  # not a JSON object, e.g. a proxy's error page
+        return {"online": True, "ok": False}
+    except httpx.HTTPError:
+        return {"online": False, "ok": False}
+
+
+def stream_tokens(response, done: dict):
+    """
+    Yield tokens from the /chat/stream server-sent events as they arrive.
+    The final `done` (or `error`) event payload is stored in `done`.
+    """
+    event = None
+    for line in response.iter_lines():
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            data = json.loads(line[len("data: "):])
+            if event == "token":
+                yield data["token"]
+            else:
+                done.update(data)
+
+
 # Initialize session ID (for Langfuse session tracking)
 if "session_id" not in st.session_state:
     st.session_state.session_id = str(uuid.uuid4())
@@ -44,49 +90,52 @@ if query := st.chat_input("Ask me anything..."):
     with st.chat_message("user"):
         st.write(query)
     
-    # Get response from API with session tracking
+    # Stream response from API with session tracking
     with st.chat_message("assistant"):
-        with st.spinner("Researching..."):
-            try:
-                # Include session ID in headers for Langfuse tracking
-                headers = {
-                    "X-Session-ID": st.session_state.session_id,
-                    "X-User-ID": "streamlit-user"  # Simple user ID for demo
-                }
-                
-                response = requests.post(
-                    f"{API_URL}/chat",
-                    json={"message": query},
-                    headers=headers,
-                    timeout=60
-                )
+        try:
+            # Include session ID in headers for Langfuse tracking
+            headers = {
+                "X-Session-ID": st.session_state.session_id,
+                "X-User-ID": "streamlit-user"  # Simple user ID for demo
+            }
+            
+            with get_http_client().stream(
+                "POST",
+                "/chat/stream",
+                json={"message": query},
+                headers=headers
+            ) as response:
                 response.raise_for_status()
-                result = response.json()
-                assistant_response = result.get("response", "No response received")
-                latency = result.get("latency", 0)
-                
-                st.write(assistant_response)
-                if latency:
-                    st.caption(f"⏱️ Response time: {latency:.2f}s")
-                
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": assistant_response
-                })
                 
-            except requests.exceptions.ConnectionError:
-                error_msg = f"❌ Could not connect to API at {API_URL}. Make sure your backend is running!"
-                st.error(error_msg)
-                st.info("For local testing, start your backend with: `python -m uvicorn main:app --reload`")
-                
-            except requests.exceptions.Timeout:
-                error_msg = "⏱️ Request timed out. The query might be too complex."
-                st.error(error_msg)
-                
-            except requests.exceptions.RequestException as e:
-                error_msg = f"❌ Error: {str(e)}"
-                st.error(error_msg)
-                st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                done = {}
+                assistant_response = st.write_stream(stream_tokens(response, done)) or "No response received"
+            
+            if done.get("error"):
+                st.error(f"❌ Error: {done['error']}")
+            elif done.get("latency"):
+                caption = f"⏱️ Response time: {done['latency']:.2f}s"
+                if done.get("time_to_first_token") is not None:
+                    caption += f" · first token: {done['time_to_first_token']:.2f}s"
+                st.caption(caption)
+            
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": assistant_response
+            })
+            
+        except httpx.ConnectError:
+            error_msg = f"❌ Could not connect to API at {API_URL}. Make sure your backend is running!"
+            st.error(error_msg)
+            st.info("For local testing, start your backend with: `python -m uvicorn main:app --reload`")
+            
+        except httpx.TimeoutException:
+            error_msg = "⏱️ Request timed out. The query might be too complex."
+            st.error(error_msg)
+            
+        except httpx.HTTPError as e:
+            error_msg = f"❌ Error: {str(e)}"
+            st.error(error_msg)
+            st.session_state.messages.append({"role": "assistant", "content": error_msg})
 
 # Sidebar with info
 with st.sidebar:
@@ -113,19 +162,18 @@ with st.sidebar:
     st.caption("All messages in this chat are grouped in Langfuse by session ID")
     
     st.header("API Status")
-    try:
-        health_check = requests.get(f"{API_URL}/health", timeout=5)
-        if health_check.status_code == 200:
-            health_data = health_check.json()
-            st.success("✅ Backend is online")
-            if health_data.get("langfuse_available"):
-                st.success("✅ Langfuse is enabled")
-            else:
-                st.warning("⚠️ Langfuse not available")
+    health = get_health()
+    if health["ok"]:
+        st.success("✅ Backend is online")
+        if health.get("langfuse_available"):
+            st.success("✅ Langfuse is enabled")
         else:
-            st.warning("⚠️ Backend returned an error")
-    except:
+            st.warning("⚠️ Langfuse not available")
+    elif health["online"]:
+        st.warning("⚠️ Backend returned an error")
+    else:
         st.error("❌ Backend is offline")
+    st.caption("Status refreshes every 10 seconds")
     
     st.header("Settings")
     st.write(f"**API URL:** `{API_URL}`")
@@ -0,0 +1,128 @@
+"""
+Micro-batching for LLM generation.
+Concurrent requests are collected for up to `window` seconds (or until `max_batch_size` is reached)
+and sent together with `llm.abatch`; each result is fanned back to the request that submitted it.
+The time every request spent waiting for its batch to close is returned so it can be exported.
+"""
+
+import asyncio
+import os
+import time
+from typing import Optional
+
+
+class MicroBatcher:
+    """Collects concurrent LLM calls into batches."""
+
+    def __init__(self, llm, window: float = 0.01, max_batch_size: int = 16):
+        self.llm = llm
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._queue = None
+        self._loop = None
+        self._collector = None
+        self._inflight = set()  # running batch tasks; the loop only keeps weak references to tasks
+        self.counters = {"requests": 0, "batches": 0, "max_batch_size_seen": 0, "queue_wait_total": 0.0}
+
+    async def submit(self, messages: list) -> tuple:
+        """Queue one request; returns (llm_response, queue_wait_seconds)."""
+        self._ensure_collector()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((messages, future, time.perf_counter()))
+        return await future
+
+    def _ensure_collector(self):
+        # The queue and collector task belong to the running event loop (one per uvicorn worker)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect())
+
+    async def _collect(self):
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = time.perf_counter() + self.window
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Closed mid-window: these requests already left the queue, so send them rather than drop them
+                if batch:
+                    self._dispatch(batch)
+                raise
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: list):
+        # Run the batch in its own task so the next window starts collecting immediately
+        task = asyncio.create_task(self._run_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def close(self):
+        """Stop collecting and wait for in-flight batches, so every submitted request gets its answer."""
+        if self._collector is not None:
+            collector = self._collector
+            self._collector = None
+            self._loop = None
+            collector.cancel()
+            await asyncio.gather(collector, return_exceptions=True)  # dispatches a half-collected batch
+            while not self._queue.empty():  # queued but never collected into a batch
+                _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("MicroBatcher closed"))
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def _run_batch(self, batch: list):
+        dispatched_at = time.perf_counter()
+        self.counters["requests"] += len(batch)
+        self.counters["batches"] += 1
+        self.counters["max_batch_size_seen"] = max(self.counters["max_batch_size_seen"], len(batch))
+        try:
+            results = await self.llm.abatch([messages for messages, _, _ in batch], return_exceptions=True)
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future, enqueued_at), result in zip(batch, results):
+            queue_wait = dispatched_at - enqueued_at
+            self.counters["queue_wait_total"] += queue_wait
+            if future.done():
+                continue  # caller went away (e.g. client disconnected)
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result((result, queue_wait))
+
+    def stats(self) -> dict:
+        requests = self.counters["requests"]
+        return {
+            "requests": requests,
+            "batches": self.counters["batches"],
+            "avg_batch_size": requests / self.counters["batches"] if self.counters["batches"] else 0.0,
+            "max_batch_size_seen": self.counters["max_batch_size_seen"],
+            "avg_queue_wait_ms": 1000 * self.counters["queue_wait_total"] / requests if requests else 0.0,
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+        }
+
+
+def create_batcher(llm) -> Optional[MicroBatcher]:
+    """
+    Build the batcher from environment variables:
+    LLM_BATCHING=on|off (default off), BATCH_WINDOW_MS, BATCH_MAX_SIZE.
+    """
+    if not llm or os.getenv("LLM_BATCHING", "off").lower() != "on":
+        return None
+    return MicroBatcher(
+        llm,
+        window=float(os.getenv("BATCH_WINDOW_MS", "10")) / 1000,
+        max_batch_size=int(os.getenv("BATCH_MAX_SIZE", "16")),
+    )
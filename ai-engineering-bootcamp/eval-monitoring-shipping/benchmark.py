@@ -0,0 +1,237 @@
+"""
+Load test for the research assistant API.
+Starts main.py under uvicorn with the mock LLM (no OPENAI_API_KEY) and an injected generation latency,
+drives /chat at a fixed rate or a fixed concurrency, and reports throughput plus p50/p95/p99 latency
+for the whole request and for each span (query_analysis, generate_response, validate_response).
+
+Run:
+    python benchmark.py --concurrency 32 --requests 2000 --mock-latency-ms 200
+    python benchmark.py --rps 100 --duration 30
+    python benchmark.py --compare benchmarks/a.json benchmarks/b.json
+
+Results are written as JSON (with the git commit) so runs can be compared across commits.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+SPANS = ["query_analysis", "generate_response", "validate_response"]
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(values: list) -> dict:
+    """Latency summary in milliseconds."""
+    return {
+        "count": len(values),
+        "mean_ms": 1000 * sum(values) / len(values) if values else 0.0,
+        "p50_ms": 1000 * percentile(values, 50),
+        "p95_ms": 1000 * percentile(values, 95),
+        "p99_ms": 1000 * percentile(values, 99),
+        "max_ms": 1000 * max(values) if values else 0.0,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def start_server(port: int, args) -> subprocess.Popen:
+    """Run main:app with the mock LLM; Langfuse keys are removed so nothing leaves the machine."""
+    env = {k: v for k, v in os.environ.items() if not k.startswith("LANGFUSE_")}
+    env.update({
+        "OPENAI_API_KEY": "",
+        "MOCK_LLM_LATENCY_MS": str(args.mock_latency_ms),
+        "MAX_CONCURRENT_REQUESTS": str(args.max_concurrent_requests),
+        "RESPONSE_CACHE": "off",
+        "TELEMETRY_EXPORTER": "fake",
+        "TELEMETRY_SYNTHETIC_TRACE_IDS": "on",
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=HERE, env=env,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+async def wait_for_telemetry_flush(client: httpx.AsyncClient, timeout: float = 5.0) -> Optional[dict]:
+    """Exporter counters of whichever worker answers /health, once its queued scores have been exported."""
+    deadline = time.monotonic() + timeout
+    while True:
+        stats = (await client.get("/health")).json().get("telemetry")
+        if not stats or stats["exported"] >= stats["enqueued"] or time.monotonic() > deadline:
+            return stats
+        await asyncio.sleep(0.2)
+
+
+async def send(client: httpx.AsyncClient, index: int, samples: list, errors: list):
+    start = time.perf_counter()
+    try:
+        response = await client.post("/chat", json={"message": f"Benchmark query {index}: what is latency?"})
+        response.raise_for_status()
+        body = response.json()
+        samples.append({"total": time.perf_counter() - start, **body.get("timings", {})})
+    except Exception as e:
+        errors.append(type(e).__name__)
+
+
+async def run_fixed_concurrency(client, concurrency: int, total: int, samples: list, errors: list):
+    """Closed loop: `concurrency` clients each send their next request as soon as the previous returns."""
+    counter = iter(range(total))
+
+    async def worker():
+        for index in counter:
+            await send(client, index, samples, errors)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def run_fixed_rps(client, rps: float, duration: float, samples: list, errors: list):
+    """Open loop: requests start on a fixed schedule regardless of how slow responses are."""
+    tasks, start, index = [], time.perf_counter(), 0
+    while (now := time.perf_counter() - start) < duration:
+        tasks.append(asyncio.create_task(send(client, index, samples, errors)))
+        index += 1
+        await asyncio.sleep(max(index / rps - now, 0))
+    await asyncio.gather(*tasks)
+
+
+async def run(args) -> dict:
+    port = args.port or free_port()
+    server = None if args.url else start_server(port, args)
+    base_url = args.url or f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=args.concurrency or 1000, max_keepalive_connections=args.concurrency or 1000)
+
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+            await wait_until_ready(client)
+            samples, errors = [], []
+            start = time.perf_counter()
+            if args.rps:
+                await run_fixed_rps(client, args.rps, args.duration, samples, errors)
+            else:
+                await run_fixed_concurrency(client, args.concurrency, args.requests, samples, errors)
+            elapsed = time.perf_counter() - start
+            telemetry_stats = await wait_for_telemetry_flush(client)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "mode": "fixed_rps" if args.rps else "fixed_concurrency",
+            "rps": args.rps, "duration": args.duration,
+            "concurrency": args.concurrency, "requests": args.requests,
+            "mock_latency_ms": args.mock_latency_ms, "workers": args.workers,
+            "max_concurrent_requests": args.max_concurrent_requests, "url": base_url,
+        },
+        "completed": len(samples),
+        "errors": len(errors),
+        "error_types": sorted(set(errors)),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "latency": summarize([s["total"] for s in samples]),
+        "spans": {span: summarize([s[span] for s in samples if span in s]) for span in SPANS},
+        "telemetry": telemetry_stats,
+    }
+
+
+def print_report(result: dict):
+    print(f"commit {result['commit']}  {result['config']['mode']}  "
+          f"{result['completed']} ok / {result['errors']} errors in {result['elapsed_s']:.1f}s")
+    print(f"throughput: {result['throughput_rps']:.1f} req/s")
+    print(f"{'':20} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for name, stats in [("request", result["latency"]), *result["spans"].items()]:
+        print(f"{name:20} {stats['p50_ms']:10.2f} {stats['p95_ms']:10.2f} {stats['p99_ms']:10.2f}")
+    if result.get("telemetry"):
+        t = result["telemetry"]
+        print(f"telemetry ({t.get('sink')}): {t.get('enqueued')} scores queued, {t.get('exported')} exported, "
+              f"{t.get('dropped')} dropped")
+
+
+def compare(baseline_path: str, candidate_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(candidate_path) as f:
+        candidate = json.load(f)
+    print(f"{baseline['commit']} -> {candidate['commit']}")
+    print(f"throughput: {baseline['throughput_rps']:.1f} -> {candidate['throughput_rps']:.1f} req/s")
+    for p in ["p50_ms", "p95_ms", "p99_ms"]:
+        print(f"request {p}: {baseline['latency'][p]:.2f} -> {candidate['latency'][p]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the research assistant API")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients (fixed-concurrency mode)")
+    parser.add_argument("--requests", type=int, default=500, help="Total requests (fixed-concurrency mode)")
+    parser.add_argument("--rps", type=float, default=0, help="Target request rate; switches to fixed-RPS mode")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run in fixed-RPS mode")
+    parser.add_argument("--mock-latency-ms", type=float, default=100, help="Injected mock LLM latency")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--max-concurrent-requests", type=int, default=32, help="Per-worker MAX_CONCURRENT_REQUESTS")
+    parser.add_argument("--url", help="Benchmark an already running server instead of starting one")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    result = asyncio.run(run(args))
+    print_report(result)
+
+    output = args.output or os.path.join(
+        HERE, "benchmarks", f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{result['commit']}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Token budgeting for generate_response.
+- Count and cap input tokens before the prompt is sent.
+- Derive the completion `max_tokens` from validate_response's character limit,
+  so we never pay to generate an answer that validation would reject as too long.
+
+Uses tiktoken (installed with langchain-openai) and falls back to a ~4 characters/token estimate.
+"""
+
+import math
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Average characters per token for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4.0
+
+
+@lru_cache(maxsize=8)
+def get_encoding(model: str):
+    """Tokenizer for a model, or None when tiktoken or its vocabulary file isn't available."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken downloads the vocabulary on first use; offline we fall back to the estimate
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str) -> tuple:
+    """Cut text to at most max_tokens tokens. Returns (text, was_truncated)."""
+    encoding = get_encoding(model)
+    if encoding is None:
+        max_chars = int(max_tokens * CHARS_PER_TOKEN)
+        return text[:max_chars], len(text) > max_chars
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text, False
+    return encoding.decode(tokens[:max_tokens]), True
+
+
+def max_tokens_for_chars(max_chars: int) -> int:
+    """Completion token limit that keeps an answer within max_chars on average."""
+    return max(int(max_chars / CHARS_PER_TOKEN), 1)
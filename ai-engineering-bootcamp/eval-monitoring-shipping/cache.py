@@ -0,0 +1,321 @@
+"""
+Response cache for the research assistant.
+Two tiers sit in front of generate_response:
+- exact: normalized query + model + prompt version
+- semantic: cosine similarity between query embeddings above a threshold
+
+Storage is pluggable: InMemoryBackend (default) or SQLiteBackend (on disk, shared by processes).
+Both enforce a TTL and evict least-recently-used entries past a max entry count / byte size.
+Embeddings are scored as one matrix-vector product; SQLite calls run on a worker thread, off the event loop.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+# Limits shared by both backends and create_response_cache (CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL_SECONDS)
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 50_000_000
+DEFAULT_TTL_SECONDS = 3600.0
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation so trivial variants share a key."""
+    query = re.sub(r"\s+", " ", query.strip().lower())
+    return query.rstrip("?!. ")
+
+
+def unit_vector(vector: list) -> np.ndarray:
+    """Normalize an embedding (as float32) so cosine similarity becomes a plain dot product."""
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / (float(np.linalg.norm(vector)) or 1.0)
+
+
+def entry_size(response: str, embedding: Optional[np.ndarray]) -> int:
+    """Approximate bytes held by one entry (response text + embedding)."""
+    return len(response.encode()) + (embedding.nbytes if embedding is not None else 0)
+
+
+def _no_candidates() -> tuple:
+    return [], [], np.empty((0, 0), dtype=np.float32)
+
+
+class InMemoryBackend:
+    """In-process LRU store with TTL. Not shared across workers."""
+
+    blocking = False  # every call is a dict operation, cheap enough to run on the event loop
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (namespace, response, embedding, created_at, size)
+        self._bytes = 0
+        self._matrices = {}  # namespace -> (keys, responses, created_at, embedding matrix), rebuilt after changes
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[3] > self.ttl:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, namespace: str, response: str, embedding: Optional[np.ndarray]):
+        size = entry_size(response, embedding)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (namespace, response, embedding, time.time(), size)
+            self._bytes += size
+            self._matrices.pop(namespace, None)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+
+    def scan(self, namespace: str) -> tuple:
+        """(keys, responses, embedding matrix) of live entries in a namespace, one matrix row per entry."""
+        with self._lock:
+            snapshot = self._matrices.get(namespace)
+            if snapshot is None:
+                rows = [(key, entry[1], entry[3], entry[2]) for key, entry in self._entries.items()
+                        if entry[0] == namespace and entry[2] is not None]
+                if not rows:
+                    return _no_candidates()
+                keys, responses, created, embeddings = zip(*rows)
+                snapshot = self._matrices[namespace] = (list(keys), list(responses), np.array(created),
+                                                        np.stack(embeddings))
+        keys, responses, created, matrix = snapshot
+        live = created >= time.time() - self.ttl
+        if live.all():
+            return keys, responses, matrix
+        rows = np.flatnonzero(live)
+        return [keys[i] for i in rows], [responses[i] for i in rows], matrix[rows]
+
+    def touch(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[4]
+        self._matrices.pop(entry[0], None)
+
+
+class SQLiteBackend:
+    """On-disk LRU store with TTL. Safe to share between processes on the same host."""
+
+    blocking = True  # calls can wait on disk and on other workers' write locks
+
+    def __init__(self, path: str = "response_cache.db", max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    embedding BLOB,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_access ON response_cache(last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_namespace ON response_cache(namespace)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers and a writer proceed concurrently
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT response FROM response_cache WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, namespace: str, response: str, embedding: Optional[np.ndarray]):
+        now = time.time()
+        blob = embedding.tobytes() if embedding is not None else None
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, namespace, response, blob, now, now, entry_size(response, embedding)),
+            )
+            conn.execute("DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl,))
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache").fetchone()
+            while count > self.max_entries or total > self.max_bytes:
+                # Evict the least recently used entries in small batches
+                evicted = conn.execute(
+                    "SELECT key, size FROM response_cache ORDER BY last_access LIMIT ?",
+                    (max(count - self.max_entries, 1),),
+                ).fetchall()
+                if not evicted:
+                    break
+                conn.executemany("DELETE FROM response_cache WHERE key = ?", [(k,) for k, _ in evicted])
+                count -= len(evicted)
+                total -= sum(size for _, size in evicted)
+
+    def scan(self, namespace: str) -> tuple:
+        rows = self._conn().execute(
+            "SELECT key, response, embedding FROM response_cache "
+            "WHERE namespace = ? AND embedding IS NOT NULL AND created_at >= ?",
+            (namespace, time.time() - self.ttl),
+        ).fetchall()
+        if not rows:
+            return _no_candidates()
+        keys, responses, blobs = zip(*rows)
+        # Embeddings are stored as raw float32 bytes; decode all rows in one call
+        matrix = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(rows), -1)
+        return list(keys), list(responses), matrix
+
+    def touch(self, key: str):
+        with self._conn() as conn:
+            conn.execute("UPDATE response_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+@dataclass
+class CacheLookup:
+    """Result of a cache lookup. On a miss, `embedding` is kept so store() doesn't embed twice."""
+    response: Optional[str] = None
+    tier: Optional[str] = None  # "exact" | "semantic" | None
+    similarity: Optional[float] = None
+    embedding: Optional[np.ndarray] = None
+
+
+class ResponseCache:
+    """Exact + semantic response cache over a pluggable backend."""
+
+    def __init__(
+        self,
+        backend,
+        model: str,
+        prompt_version: str,
+        embed: Optional[Callable[[str], Awaitable[list]]] = None,
+        similarity_threshold: float = 0.95,
+    ):
+        self.backend = backend
+        self.namespace = f"{model}:{prompt_version}"
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.counters = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    async def _call(self, method, *args):
+        """Run a backend call; blocking (SQLite) backends run on a worker thread so the event loop keeps serving."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    def key(self, query: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\n{normalize_query(query)}".encode()).hexdigest()
+
+    async def lookup(self, query: str) -> CacheLookup:
+        key = self.key(query)
+        response = await self._call(self.backend.get, key)
+        if response is not None:
+            self.counters["exact_hits"] += 1
+            return CacheLookup(response=response, tier="exact", similarity=1.0)
+
+        embedding = None
+        if self.embed:
+            try:
+                embedding = unit_vector(await self.embed(normalize_query(query)))
+            except Exception:
+                # Embedding outage degrades to exact-only caching, never fails the request
+                embedding = None
+        if embedding is not None:
+            keys, responses, matrix = await self._call(self.backend.scan, self.namespace)
+            if keys:
+                scores = matrix @ embedding
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    await self._call(self.backend.touch, keys[best])
+                    self.counters["semantic_hits"] += 1
+                    return CacheLookup(response=responses[best], tier="semantic", similarity=float(scores[best]))
+
+        self.counters["misses"] += 1
+        return CacheLookup(embedding=embedding)
+
+    async def store(self, query: str, response: str, lookup: Optional[CacheLookup] = None):
+        embedding = lookup.embedding if lookup else None
+        await self._call(self.backend.put, self.key(query), self.namespace, response, embedding)
+
+    def stats(self) -> dict:
+        hits = self.counters["exact_hits"] + self.counters["semantic_hits"]
+        total = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": len(self.backend),
+            "backend": type(self.backend).__name__,
+        }
+
+
+def create_response_cache(model: str, prompt_version: str) -> Optional[ResponseCache]:
+    """
+    Build the cache from environment variables:
+    RESPONSE_CACHE=memory|sqlite|off, CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES,
+    CACHE_SQLITE_PATH, CACHE_SEMANTIC=on|off, CACHE_SIMILARITY_THRESHOLD.
+    """
+    kind = os.getenv("RESPONSE_CACHE", "memory").lower()
+    if kind == "off":
+        return None
+
+    ttl = float(os.getenv("CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    max_entries = int(os.getenv("CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+    max_bytes = int(os.getenv("CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+    if kind == "sqlite":
+        backend = SQLiteBackend(os.getenv("CACHE_SQLITE_PATH", "response_cache.db"), max_entries, max_bytes, ttl)
+    else:
+        backend = InMemoryBackend(max_entries, max_bytes, ttl)
+
+    # Semantic tier needs an embedding model; 256 dims keeps the similarity scan cheap
+    embed = None
+    if os.getenv("CACHE_SEMANTIC", "on").lower() != "off" and os.getenv("OPENAI_API_KEY"):
+        from langchain_openai import OpenAIEmbeddings
+        embed = OpenAIEmbeddings(model="text-embedding-3-small", dimensions=256).aembed_query
+
+    return ResponseCache(
+        backend,
+        model=model,
+        prompt_version=prompt_version,
+        embed=embed,
+        similarity_threshold=float(os.getenv("CACHE_SIMILARITY_THRESHOLD", "0.95")),
+    )
@@ -0,0 +1,19 @@
+"""
+Record/replay ("cassette") for this project's LLM calls.
+The store, request keys and adapters live in the shared llm_cassette package at the repository root; this module puts
+it on the import path and re-exports what the project uses. Settings (LLM_CASSETTE, LLM_CASSETTE_PATH,
+LLM_CASSETTE_LATENCY_MS) are described in llm_cassette/__init__.py.
+
+    wrap_chat_model(llm, model)           LangChain chat models (main.py, eval_runner.py)
+    achat_completion(create, **request)   AsyncOpenAI clients (simple_openai_langfuse.py)
+"""
+
+import os
+import sys
+
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from llm_cassette import CassetteMiss, CassetteStore, achat_completion, chat_completion, open_cassette  # noqa: E402
+from llm_cassette.langchain import CassetteChatModel, wrap_chat_model  # noqa: E402
@@ -0,0 +1,226 @@
+"""
+Offline batch evaluation for the research assistant.
+Runs `research_assistant` from main.py over a JSONL dataset with bounded concurrency (asyncio inside
+each worker process), then scores every case and writes a columnar results file.
+
+Dataset lines:  {"id": "q1", "query": "What is ...?", "reference": "expected answer text"}
+
+Run:
+    python eval_runner.py dataset.jsonl                          # mock LLM, 1 process
+    python eval_runner.py dataset.jsonl --processes 4 --concurrency 64 --mock-latency-ms 200
+    python eval_runner.py dataset.jsonl --llm live                # real OpenAI calls
+    LLM_CASSETTE=record python eval_runner.py dataset.jsonl --llm live
+    python eval_runner.py dataset.jsonl --llm recorded            # replay that cassette offline
+
+Completed chunks are appended to `<output>.checkpoint.jsonl`; rerunning the same command skips them,
+so an interrupted run resumes where it stopped.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+def read_jsonl(path: str) -> list:
+    with (sys.stdin if path == "-" else open(path)) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- Worker side (runs in each pool process) ---
+
+_main = None
+
+
+def init_worker():
+    """Import main.py once per process; the LLM (mock, cassette replay or live) follows the environment set by main()."""
+    global _main
+    import main
+    _main = main
+
+
+async def run_case(case: dict, slots: asyncio.Semaphore) -> dict:
+    row = {"id": case["id"], "query": case["query"], "reference": case.get("reference", ""), "error": None}
+    async with slots:
+        try:
+            result = await _main.research_assistant(case["query"])
+            row.update({
+                "response": result["response"],
+                "valid": result["validation"]["valid"],
+                "validation_errors": "; ".join(result["validation"]["errors"]),
+                "latency": result["latency"],
+                **{f"{span}_s": seconds for span, seconds in result["timings"].items()},
+            })
+        except Exception as e:
+            row.update({"response": "", "valid": False, "validation_errors": "", "latency": float("nan"), "error": repr(e)})
+    return row
+
+
+def run_chunk(cases: list, concurrency: int) -> list:
+    async def run_all():
+        slots = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(run_case(case, slots) for case in cases))
+    return asyncio.run(run_all())
+
+
+# --- Scoring ---
+
+def word_overlap(left: list, right: list) -> np.ndarray:
+    """
+    Vectorized share of each left text's unique words found in the matching right text.
+    Words are mapped to integer ids once; membership for every (row, word) pair is a single np.isin.
+    """
+    vocabulary = {}
+    left_rows, left_ids, right_rows, right_ids = [], [], [], []
+    for row, (a, b) in enumerate(zip(left, right)):
+        for word in set(a.lower().split()):
+            left_rows.append(row)
+            left_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+        for word in set(b.lower().split()):
+            right_rows.append(row)
+            right_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+    # (row, word) pairs packed into one int64 key so membership is a flat array lookup
+    size = max(len(vocabulary), 1)
+    left_rows = np.asarray(left_rows, dtype=np.int64)
+    left_keys = left_rows * size + np.asarray(left_ids, dtype=np.int64)
+    right_keys = np.asarray(right_rows, dtype=np.int64) * size + np.asarray(right_ids, dtype=np.int64)
+
+    found = np.isin(left_keys, right_keys)
+    hits = np.bincount(left_rows, weights=found, minlength=len(left))
+    totals = np.bincount(left_rows, minlength=len(left))
+    return np.minimum(hits / np.maximum(totals, 1), 1.0)
+
+
+def score(rows: list) -> dict:
+    """Turn result rows into columns and add relevance, reference overlap and latency scores."""
+    # Failed cases have no span timings, so take the union of keys across rows
+    keys = dict.fromkeys(key for row in rows for key in row)
+    columns = {key: [row.get(key) for row in rows] for key in keys}
+    latency = np.asarray(columns["latency"], dtype=float)
+    # Same heuristic as the live `relevance` score: share of query words found in the response
+    columns["relevance"] = word_overlap(columns["query"], columns["response"]).tolist()
+    columns["reference_overlap"] = word_overlap(columns["reference"], columns["response"]).tolist()
+    columns["latency_ok"] = (latency < _latency_ok_seconds()).tolist()
+    return columns
+
+
+def _latency_ok_seconds() -> float:
+    import main
+    return main.LATENCY_OK_SECONDS
+
+
+def summarize(columns: dict) -> dict:
+    latency = np.asarray(columns["latency"], dtype=float)
+    ok = ~np.isnan(latency)
+    return {
+        "cases": len(latency),
+        "errors": int((~ok).sum()),
+        "relevance_mean": float(np.mean(columns["relevance"])),
+        "reference_overlap_mean": float(np.mean(columns["reference_overlap"])),
+        "valid_rate": float(np.mean(np.asarray(columns["valid"], dtype=bool))),
+        "latency_ok_rate": float(np.mean(columns["latency_ok"])),
+        "latency_p50_s": float(np.percentile(latency[ok], 50)) if ok.any() else 0.0,
+        "latency_p95_s": float(np.percentile(latency[ok], 95)) if ok.any() else 0.0,
+    }
+
+
+def write_columns(columns: dict, path: str):
+    """Parquet when pyarrow is installed, otherwise column-oriented JSON."""
+    if path.endswith(".parquet"):
+        if pa is None:
+            sys.exit("Writing .parquet needs pyarrow (pip install pyarrow); use a .json output instead")
+        pq.write_table(pa.table(columns), path)
+    else:
+        with open(path, "w") as f:
+            json.dump(columns, f)
+
+
+# --- Driver ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-evaluate the research assistant")
+    parser.add_argument("dataset", help="JSONL file with query/reference per line ('-' for stdin)")
+    parser.add_argument("--output", default="eval_results.parquet" if pa else "eval_results.json")
+    parser.add_argument("--llm", choices=["mock", "recorded", "live"], default="mock")
+    parser.add_argument("--recordings", default=os.getenv("LLM_CASSETTE_PATH", "cassettes/llm.jsonl"),
+                        help="Cassette replayed by --llm recorded (record one with LLM_CASSETTE=record and --llm live)")
+    parser.add_argument("--mock-latency-ms", type=float, default=0, help="Injected latency for --llm mock")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="In-flight cases per process")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Cases per checkpointed chunk")
+    args = parser.parse_args()
+
+    if args.llm == "recorded" and not os.path.exists(args.recordings):
+        parser.error(f"--llm recorded needs a cassette, {args.recordings} not found")
+
+    # Configure main.py before any process imports it: no Langfuse export, no cache, optional mock LLM.
+    # Without LANGFUSE_* keys, main.py's @observe spans and Langfuse client send nothing (like benchmark.py)
+    for key in [key for key in os.environ if key.startswith("LANGFUSE_")]:
+        del os.environ[key]
+    os.environ.update({"TELEMETRY_EXPORTER": "off", "RESPONSE_CACHE": "off", "MOCK_LLM_LATENCY_MS": str(args.mock_latency_ms)})
+    if args.llm != "live":
+        os.environ["OPENAI_API_KEY"] = ""
+    if args.llm == "recorded":
+        # Replay-only cassette: a case whose request was never recorded fails with CassetteMiss
+        os.environ.update({"LLM_CASSETTE": "replay", "LLM_CASSETTE_PATH": args.recordings})
+
+    cases = read_jsonl(args.dataset)
+    for index, case in enumerate(cases):
+        case.setdefault("id", str(index))
+
+    checkpoint = f"{args.output}.checkpoint.jsonl"
+    done = {}
+    if os.path.exists(checkpoint):
+        for row in read_jsonl(checkpoint):
+            done[row["id"]] = row
+        print(f"Resuming: {len(done)} of {len(cases)} cases already done")
+
+    pending = [case for case in cases if case["id"] not in done]
+    chunks = [pending[i:i + args.chunk_size] for i in range(0, len(pending), args.chunk_size)]
+    start = time.perf_counter()
+
+    with open(checkpoint, "a") as out:
+        def save(rows):
+            for row in rows:
+                done[row["id"]] = row
+                out.write(json.dumps(row) + "\n")
+            out.flush()
+            print(f"  {len(done)}/{len(cases)} cases", flush=True)
+
+        if args.processes > 1:
+            with ProcessPoolExecutor(args.processes, initializer=init_worker) as pool:
+                futures = [pool.submit(run_chunk, chunk, args.concurrency) for chunk in chunks]
+                for future in as_completed(futures):
+                    save(future.result())
+        else:
+            init_worker()
+            for chunk in chunks:
+                save(run_chunk(chunk, args.concurrency))
+
+    elapsed = time.perf_counter() - start
+    rows = [done[case["id"]] for case in cases]
+    if not rows:
+        sys.exit("Dataset is empty")
+    columns = score(rows)
+    write_columns(columns, args.output)
+
+    summary = summarize(columns)
+    print(f"\nEvaluated {len(pending)} new cases in {elapsed:.1f}s ({len(pending) / max(elapsed, 1e-9):.0f} cases/s)")
+    for key, value in summary.items():
+        print(f"  {key}: {value:.3f}" if isinstance(value, float) else f"  {key}: {value}")
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
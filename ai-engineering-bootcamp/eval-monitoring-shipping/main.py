@@ -5,15 +5,29 @@ Demonstrates tracing, scoring, and session tracking.
 Deploy this to Render.com
 """
 
-from fastapi import FastAPI, Request, Header
+from fastapi import FastAPI, Request, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from contextlib import aclosing, asynccontextmanager
 from pydantic import BaseModel
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
+import asyncio
+import json
+import math
 import os
 import time
+import uuid
 from typing import Optional
 
+from cache import create_response_cache
+from telemetry import create_exporter
+from batching import create_batcher
+from metrics import MetricsRegistry
+from rate_limit import create_rate_limiter
+from budget import count_tokens, max_tokens_for_chars, truncate_tokens
+from cassette import wrap_chat_model
+
 # Langfuse integration - make it optional for compatibility
 LANGFUSE_AVAILABLE = False
 try:
@@ -31,10 +45,31 @@ except (ImportError, Exception) as e:
         @staticmethod
         def get_current_trace_id():
             return None
+        
+        @staticmethod
+        def update_current_observation(**kwargs):
+            pass
     
     Langfuse = None
 
-app = FastAPI(title="Research Assistant API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker startup: (re)create clients in this process, then start the telemetry exporter.
+    Queued scores are flushed and in-flight LLM batches finished on shutdown.
+    """
+    init_clients()
+    if telemetry:
+        telemetry.start()
+    yield
+    if batcher:
+        await batcher.close()
+    if telemetry:
+        telemetry.stop()
+
+
+app = FastAPI(title="Research Assistant API", lifespan=lifespan)
 
 # Enable CORS for Streamlit frontend
 app.add_middleware(
@@ -45,18 +80,125 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize LLM
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0) if os.getenv("OPENAI_API_KEY") else None
+LLM_MODEL = "gpt-4o-mini"
 
-# Initialize Langfuse client if available
-langfuse_client = Langfuse() if LANGFUSE_AVAILABLE and Langfuse else None
+# Bump when build_prompt changes so cached answers from the old prompt are not reused
+PROMPT_VERSION = "v1"
+
+# Token budget: validate_response's length limits drive the completion limit, so we never pay
+# to generate an answer that would be rejected as too long
+MIN_RESPONSE_CHARS = 10
+MAX_RESPONSE_CHARS = 5000
+MAX_INPUT_TOKENS = int(os.getenv("MAX_INPUT_TOKENS", "2000"))
+MAX_OUTPUT_TOKENS = max_tokens_for_chars(MAX_RESPONSE_CHARS)
+
+# Per-process clients, created by init_clients(). Each worker process must own its own HTTP
+# connections and background threads, so they are rebuilt whenever the PID changes (e.g. after fork).
+llm = None
+batcher = None
+langfuse_client = None
+telemetry = None
+response_cache = None
+rate_limiter = None
+_clients_pid = None
+
+
+def init_clients():
+    """Create the LLM, Langfuse, cache, telemetry and rate-limit clients for the current process."""
+    global llm, batcher, langfuse_client, telemetry, response_cache, rate_limiter, _clients_pid
+    if _clients_pid == os.getpid():
+        return
+    _clients_pid = os.getpid()
+    
+    # Initialize LLM
+    llm = ChatOpenAI(
+        model=LLM_MODEL, temperature=0, max_tokens=MAX_OUTPUT_TOKENS, stream_usage=True
+    ) if os.getenv("OPENAI_API_KEY") else None
+    
+    # Record/replay LLM calls to a local cassette file (LLM_CASSETTE=record|replay|auto)
+    llm = wrap_chat_model(llm, LLM_MODEL)
+    
+    # Optional micro-batching of concurrent generate_response calls (LLM_BATCHING=on)
+    batcher = create_batcher(llm)
+    
+    # Initialize Langfuse client if available
+    langfuse_client = Langfuse() if LANGFUSE_AVAILABLE and Langfuse else None
+    
+    # Scores are queued and exported in batches by a background thread (TELEMETRY_EXPORTER=langfuse|fake|off)
+    telemetry = create_exporter(langfuse_client)
+    
+    # Exact + semantic response cache (RESPONSE_CACHE=memory|sqlite|off); sqlite is shared across workers
+    response_cache = create_response_cache(LLM_MODEL, PROMPT_VERSION)
+    
+    # Per-user rate limit (RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BACKEND=memory|sqlite)
+    rate_limiter = create_rate_limiter()
+
+
+init_clients()
+
+# Max /chat requests handled concurrently by this worker; extra requests wait for a free slot
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "32"))
+request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# In-process metrics, exposed at /metrics in Prometheus text format
+registry = MetricsRegistry()
+SPAN_LATENCY = registry.histogram("research_assistant_span_latency_seconds", "Latency of each traced span", ("span",))
+REQUEST_LATENCY = registry.histogram("research_assistant_request_latency_seconds", "End-to-end request latency, including time waiting for a slot", ("endpoint",))
+REQUESTS_IN_FLIGHT = registry.gauge("research_assistant_requests_in_flight", "Requests currently being processed", ("endpoint",))
+REQUESTS_WAITING = registry.gauge("research_assistant_requests_waiting", "Requests waiting for a concurrency slot")
+CACHE_LOOKUPS = registry.counter("research_assistant_cache_lookups_total", "Response cache lookups by result", ("result",))
+LLM_TOKENS = registry.counter("research_assistant_llm_tokens_total", "LLM tokens used", ("type",))
 
 
 class Query(BaseModel):
     message: str
 
 
+@asynccontextmanager
+async def request_slot(endpoint: str):
+    """Hold a concurrency slot for one request while tracking waiting/in-flight gauges and latency."""
+    start = time.perf_counter()
+    REQUESTS_WAITING.inc()
+    try:
+        await request_slots.acquire()
+    finally:
+        REQUESTS_WAITING.dec()
+    REQUESTS_IN_FLIGHT.inc(endpoint=endpoint)
+    try:
+        yield
+    finally:
+        REQUESTS_IN_FLIGHT.dec(endpoint=endpoint)
+        request_slots.release()
+        REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint)
+
+
+async def check_rate_limit(request: Request, user_id: Optional[str]):
+    """Reject the request with 429 + Retry-After when the caller is over its rate limit."""
+    if not rate_limiter:
+        return
+    key = user_id or (request.client.host if request.client else "anonymous")
+    if rate_limiter.blocking:
+        # The SQLite bucket may wait on another worker's write lock; wait on a thread, not the event loop
+        retry_after = await asyncio.to_thread(rate_limiter.acquire, key)
+    else:
+        retry_after = rate_limiter.acquire(key)
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
+
+def record_token_usage(usage: Optional[dict]):
+    """Add LangChain `usage_metadata` token counts to the token counter."""
+    if usage:
+        LLM_TOKENS.inc(usage.get("input_tokens", 0), type="prompt")
+        LLM_TOKENS.inc(usage.get("output_tokens", 0), type="completion")
+
+
 @observe()
+@SPAN_LATENCY.time(span="query_analysis")
 def query_analysis(query: str) -> dict:
     """
     Analyze the query - creates a span in Langfuse.
@@ -72,28 +214,150 @@ def query_analysis(query: str) -> dict:
     return analysis
 
 
+MOCK_RESPONSE = "[Mock] Research summary about the query. This is a placeholder response."
+
+# Simulated LLM latency for the mock branch (used by benchmark.py when no OPENAI_API_KEY is set)
+MOCK_LLM_LATENCY = float(os.getenv("MOCK_LLM_LATENCY_MS", "0")) / 1000
+
+
+def build_prompt(query: str) -> str:
+    """Build the research assistant prompt shared by the blocking and streaming paths."""
+    return f"""You are a research assistant. Answer the following query concisely and accurately.
+
+Query: {query}
+
+Provide a clear, factual answer."""
+
+
+def build_messages(query: str, span_metadata: dict) -> list:
+    """Prompt messages with the query capped at MAX_INPUT_TOKENS."""
+    query, truncated = truncate_tokens(query, MAX_INPUT_TOKENS, LLM_MODEL)
+    prompt = build_prompt(query)
+    span_metadata.update({
+        "query_truncated": truncated,
+        "prompt_tokens": count_tokens(prompt, LLM_MODEL),
+        "max_tokens": MAX_OUTPUT_TOKENS
+    })
+    return [HumanMessage(content=prompt)]
+
+
+def record_completion_tokens(usage: Optional[dict], response: str, span_metadata: dict):
+    """Put token counts on the span, preferring the API's usage numbers over our own count."""
+    if usage:
+        span_metadata["prompt_tokens"] = usage.get("input_tokens", span_metadata.get("prompt_tokens"))
+        span_metadata["completion_tokens"] = usage.get("output_tokens", 0)
+    else:
+        span_metadata["completion_tokens"] = count_tokens(response, LLM_MODEL)
+
+
+async def cached_response(query: str, span_metadata: dict):
+    """
+    Check the response cache and note the result in the span metadata.
+    Returns the CacheLookup (None when caching is off).
+    """
+    if not response_cache:
+        return None
+    lookup = await response_cache.lookup(query)
+    CACHE_LOOKUPS.inc(result=lookup.tier or "miss")
+    span_metadata.update({
+        "cache_hit": lookup.response is not None,
+        "cache_tier": lookup.tier,
+        "cache_similarity": lookup.similarity
+    })
+    return lookup
+
+
 @observe()
-def generate_response(query: str) -> str:
+@SPAN_LATENCY.time(span="generate_response")
+async def generate_response(query: str) -> str:
     """
     Generate response using LLM - creates a span in Langfuse.
     This shows the LLM generation step in the trace tree.
+    Uses ainvoke so the event loop keeps serving other requests while waiting on OpenAI.
     """
     if not llm:
-        return "[Mock] Research summary about the query. This is a placeholder response."
-    
-    prompt = f"""You are a research assistant. Answer the following query concisely and accurately.
+        await asyncio.sleep(MOCK_LLM_LATENCY)
+        return MOCK_RESPONSE
 
-Query: {query}
+    # Collected here and set once: each update_current_observation call replaces the metadata
+    span_metadata = {}
+    try:
+        lookup = await cached_response(query, span_metadata)
+        if lookup and lookup.response is not None:
+            return lookup.response
 
-Provide a clear, factual answer."""
+        messages = build_messages(query, span_metadata)
+        if batcher:
+            response, queue_wait = await batcher.submit(messages)
+            span_metadata["batch_queue_wait_ms"] = queue_wait * 1000
+        else:
+            response = await llm.ainvoke(messages)
+        record_token_usage(response.usage_metadata)
+        record_completion_tokens(response.usage_metadata, response.content, span_metadata)
+        
+        if response_cache:
+            await response_cache.store(query, response.content, lookup)
+        return response.content
+    finally:
+        langfuse_context.update_current_observation(metadata=span_metadata)
 
-    messages = [HumanMessage(content=prompt)]
-    response = llm.invoke(messages)
-    
-    return response.content
+
+@observe()
+@SPAN_LATENCY.time(span="stream_generate_response")
+async def stream_generate_response(query: str, tokens: asyncio.Queue) -> dict:
+    """
+    Stream the LLM response token by token - creates a span in Langfuse.
+    Each token is pushed onto `tokens` as soon as it arrives; the full text is returned at the end.
+    Generation stops early once MAX_RESPONSE_CHARS is reached.
+    """
+    start_time = time.time()
+    time_to_first_token = None
+    chunks = []
+    length = 0
+
+    if not llm:
+        await asyncio.sleep(MOCK_LLM_LATENCY)
+        await tokens.put(MOCK_RESPONSE)
+        return {"response": MOCK_RESPONSE, "time_to_first_token": time.time() - start_time}
+
+    span_metadata = {}
+    try:
+        lookup = await cached_response(query, span_metadata)
+        if lookup and lookup.response is not None:
+            await tokens.put(lookup.response)
+            return {"response": lookup.response, "time_to_first_token": time.time() - start_time}
+
+        messages = build_messages(query, span_metadata)
+        usage = None
+        # aclosing() closes the OpenAI stream right away if we stop early
+        async with aclosing(llm.astream(messages)) as stream:
+            async for chunk in stream:
+                # With stream_usage=True the final chunk carries the token counts
+                usage = chunk.usage_metadata or usage
+                record_token_usage(chunk.usage_metadata)
+                if not chunk.content:
+                    continue
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start_time
+                text = chunk.content[:MAX_RESPONSE_CHARS - length]
+                chunks.append(text)
+                length += len(text)
+                await tokens.put(text)
+                if length >= MAX_RESPONSE_CHARS:
+                    span_metadata["stopped_at_max_chars"] = True
+                    break
+
+        response = "".join(chunks)
+        record_completion_tokens(usage, response, span_metadata)
+        if response_cache and not span_metadata.get("stopped_at_max_chars"):
+            await response_cache.store(query, response, lookup)
+        return {"response": response, "time_to_first_token": time_to_first_token}
+    finally:
+        langfuse_context.update_current_observation(metadata=span_metadata)
 
 
 @observe()
+@SPAN_LATENCY.time(span="validate_response")
 def validate_response(response: str) -> dict:
     """
     Validate the response - creates a span in Langfuse.
@@ -107,69 +371,105 @@ def validate_response(response: str) -> dict:
     }
     
     # Simple validation checks
-    if len(response) < 10:
+    if len(response) < MIN_RESPONSE_CHARS:
         validation["valid"] = False
         validation["errors"].append("Response too short")
     
-    if len(response) > 5000:
+    if len(response) > MAX_RESPONSE_CHARS:
         validation["valid"] = False
         validation["errors"].append("Response too long")
     
     return validation
 
 
+# latency_ok passes when the whole request finishes under this many seconds
+LATENCY_OK_SECONDS = 3.0
+
+
+def relevance(query: str, response: str) -> float:
+    """Simple relevance check - share of query words that appear in the response (0-1)."""
+    query_words = set(query.lower().split())
+    response_words = set(response.lower().split())
+    relevance_score = len(query_words.intersection(response_words)) / max(len(query_words), 1)
+    return min(relevance_score, 1.0)  # Cap at 1.0
+
+
+# TELEMETRY_SYNTHETIC_TRACE_IDS=on gives traceless requests a made-up id so scores still reach the exporter
+# (benchmark.py sets it: without Langfuse keys there is no trace id and the fake exporter would sit idle)
+SYNTHETIC_TRACE_IDS = os.getenv("TELEMETRY_SYNTHETIC_TRACE_IDS", "off").lower() == "on"
+
+
+def current_trace_id() -> Optional[str]:
+    trace_id = langfuse_context.get_current_trace_id() if LANGFUSE_AVAILABLE else None
+    if trace_id is None and SYNTHETIC_TRACE_IDS:
+        trace_id = f"synthetic-{uuid.uuid4().hex}"
+    return trace_id
+
+
+def log_scores(trace_id: Optional[str], query: str, response: str, latency: float):
+    """Queue the relevance and latency_ok scores for a trace (exported in the background)."""
+    if not (trace_id and telemetry):
+        return
+
+    # Score: Relevance (simple check - response contains query keywords)
+    relevance_score = relevance(query, response)
+    
+    telemetry.score(
+        trace_id=trace_id,
+        name="relevance",
+        value=relevance_score,
+        comment=f"Query words found in response: {relevance_score:.2f}"
+    )
+    
+    # Score: Latency (pass if under 3 seconds)
+    latency_ok = latency < LATENCY_OK_SECONDS
+    telemetry.score(
+        trace_id=trace_id,
+        name="latency_ok",
+        value=1.0 if latency_ok else 0.0,
+        comment=f"Response time: {latency:.2f}s"
+    )
+
+
 @observe()
-def research_assistant(query: str, user_id: Optional[str] = None, session_id: Optional[str] = None) -> dict:
+async def research_assistant(query: str, user_id: Optional[str] = None, session_id: Optional[str] = None) -> dict:
     """
     Main research assistant function - orchestrates multiple spans.
     This creates a trace with child spans for each step.
     """
     start_time = time.time()
+    timings = {}
     
     # Step 1: Analyze query (creates a span)
+    step_start = time.perf_counter()
     analysis = query_analysis(query)
+    timings["query_analysis"] = time.perf_counter() - step_start
     
     # Step 2: Generate response (creates a span)
-    response = generate_response(query)
+    step_start = time.perf_counter()
+    response = await generate_response(query)
+    timings["generate_response"] = time.perf_counter() - step_start
     
     # Step 3: Validate response (creates a span)
+    step_start = time.perf_counter()
     validation = validate_response(response)
+    timings["validate_response"] = time.perf_counter() - step_start
     
     # Calculate latency
     latency = time.time() - start_time
     
     # Get trace ID for scoring
-    trace_id = langfuse_context.get_current_trace_id() if LANGFUSE_AVAILABLE else None
+    trace_id = current_trace_id()
     
     # Log scores to Langfuse
-    if trace_id and langfuse_client:
-        # Score: Relevance (simple check - response contains query keywords)
-        query_words = set(query.lower().split())
-        response_words = set(response.lower().split())
-        relevance_score = len(query_words.intersection(response_words)) / max(len(query_words), 1)
-        relevance_score = min(relevance_score, 1.0)  # Cap at 1.0
-        
-        langfuse_client.score(
-            trace_id=trace_id,
-            name="relevance",
-            value=relevance_score,
-            comment=f"Query words found in response: {relevance_score:.2f}"
-        )
-        
-        # Score: Latency (pass if under 3 seconds)
-        latency_ok = latency < 3.0
-        langfuse_client.score(
-            trace_id=trace_id,
-            name="latency_ok",
-            value=1.0 if latency_ok else 0.0,
-            comment=f"Response time: {latency:.2f}s"
-        )
+    log_scores(trace_id, query, response, latency)
     
     result = {
         "response": response,
         "analysis": analysis,
         "validation": validation,
         "latency": latency,
+        "timings": timings,
         "user_id": user_id,
         "session_id": session_id
     }
@@ -177,6 +477,53 @@ def research_assistant(query: str, user_id: Optional[str] = None, session_id: Op
     return result
 
 
+@observe()
+async def stream_research_assistant(query: str, tokens: asyncio.Queue, user_id: Optional[str] = None, session_id: Optional[str] = None) -> dict:
+    """
+    Streaming variant of research_assistant - same spans and scores.
+    Tokens go onto `tokens` as they are generated; validation and scoring run once the stream ends.
+    """
+    start_time = time.time()
+    
+    try:
+        analysis = query_analysis(query)
+        generation = await stream_generate_response(query, tokens)
+    finally:
+        # Always signal end of stream so the SSE consumer never hangs
+        await tokens.put(None)
+    
+    response = generation["response"]
+    validation = validate_response(response)
+    latency = time.time() - start_time
+    
+    trace_id = current_trace_id()
+    log_scores(trace_id, query, response, latency)
+    
+    time_to_first_token = generation["time_to_first_token"]
+    if trace_id and telemetry and time_to_first_token is not None:
+        telemetry.score(
+            trace_id=trace_id,
+            name="time_to_first_token",
+            value=time_to_first_token,
+            comment=f"First token after {time_to_first_token:.2f}s"
+        )
+    
+    return {
+        "response": response,
+        "analysis": analysis,
+        "validation": validation,
+        "latency": latency,
+        "time_to_first_token": time_to_first_token,
+        "user_id": user_id,
+        "session_id": session_id
+    }
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @app.post("/chat")
 async def chat(query: Query, request: Request, x_user_id: Optional[str] = Header(None), x_session_id: Optional[str] = Header(None)):
     """
@@ -185,29 +532,79 @@ async def chat(query: Query, request: Request, x_user_id: Optional[str] = Header
     """
     user_id = x_user_id or request.headers.get("X-User-ID")
     session_id = x_session_id or request.headers.get("X-Session-ID")
+    await check_rate_limit(request, user_id)
     
-    result = research_assistant(
-        query.message,
-        user_id=user_id,
-        session_id=session_id
-    )
+    async with request_slot("/chat"):
+        result = await research_assistant(
+            query.message,
+            user_id=user_id,
+            session_id=session_id
+        )
     
     return {
         "response": result["response"],
-        "latency": result["latency"]
+        "latency": result["latency"],
+        "timings": result["timings"]
     }
 
 
+@app.post("/chat/stream")
+async def chat_stream(query: Query, request: Request, x_user_id: Optional[str] = Header(None), x_session_id: Optional[str] = Header(None)):
+    """
+    Streaming chat endpoint - sends tokens as server-sent events.
+    Emits `token` events while generating, then a single `done` event with latency and validation.
+    """
+    user_id = x_user_id or request.headers.get("X-User-ID")
+    session_id = x_session_id or request.headers.get("X-Session-ID")
+    await check_rate_limit(request, user_id)
+    
+    async def event_stream():
+        async with request_slot("/chat/stream"):
+            tokens: asyncio.Queue = asyncio.Queue()
+            task = asyncio.create_task(
+                stream_research_assistant(query.message, tokens, user_id=user_id, session_id=session_id)
+            )
+            try:
+                while (token := await tokens.get()) is not None:
+                    yield sse_event("token", {"token": token})
+                result = await task
+                yield sse_event("done", {
+                    "latency": result["latency"],
+                    "time_to_first_token": result["time_to_first_token"],
+                    "validation": result["validation"]
+                })
+            except Exception as e:
+                yield sse_event("error", {"error": str(e)})
+            finally:
+                # Client disconnected mid-stream: stop generating
+                if not task.done():
+                    task.cancel()
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint for Render."""
     return {
         "status": "ok",
         "service": "research-assistant-api",
-        "langfuse_available": LANGFUSE_AVAILABLE
+        "worker_pid": os.getpid(),
+        "langfuse_available": LANGFUSE_AVAILABLE,
+        "max_concurrent_requests": MAX_CONCURRENT_REQUESTS,
+        "cache": response_cache.stats() if response_cache else None,
+        "telemetry": telemetry.stats() if telemetry else None,
+        "batching": batcher.stats() if batcher else None,
+        "rate_limit": type(rate_limiter).__name__ if rate_limiter else None
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: span/request latency histograms, in-flight gauges, cache and token counters."""
+    return PlainTextResponse(registry.render(), media_type=registry.content_type)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -216,19 +613,27 @@ async def root():
         "description": "Demonstrates Langfuse tracing, scoring, and session tracking",
         "endpoints": {
             "chat": "/chat (POST)",
-            "health": "/health (GET)"
+            "chat_stream": "/chat/stream (POST, server-sent events)",
+            "health": "/health (GET)",
+            "metrics": "/metrics (GET, Prometheus text format)"
         },
         "langfuse_features": {
             "tracing": "Multiple spans (query_analysis, generate_response, validate_response)",
-            "scoring": "relevance, latency_ok",
+            "scoring": "relevance, latency_ok, time_to_first_token (streaming)",
             "sessions": "Track via X-Session-ID header",
             "users": "Track via X-User-ID header"
         }
     }
 
 
-# For local testing
+# For local testing; set WEB_CONCURRENCY to serve with several worker processes
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        # Workers don't share memory: keep the response cache and rate limiter in SQLite files instead
+        os.environ.setdefault("RESPONSE_CACHE", "sqlite")
+        os.environ.setdefault("RATE_LIMIT_BACKEND", "sqlite")
+    uvicorn.run("main:app", host="0.0.0.0", port=int(os.getenv("PORT", "8000")), workers=workers)
 
@@ -0,0 +1,156 @@
+"""
+Local cache for Langfuse Prompt Management.
+- Prompts (text + config such as model and temperature) are kept in memory with a TTL and snapshotted to disk,
+  so a cold start is served from the snapshot without a network round trip.
+- Stale entries are served immediately while a background thread fetches the new version (stale-while-revalidate),
+  so prompt updates still reach the app within the TTL.
+- Pinned versions never change in Langfuse, so they are cached without expiry.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedPrompt:
+    name: str
+    version: Optional[int]
+    prompt: object  # str for text prompts, list of messages for chat prompts
+    config: dict = field(default_factory=dict)
+    fetched_at: float = 0.0
+
+    def compile(self, **variables) -> object:
+        """Fill {{variable}} placeholders, like Langfuse's prompt.compile()."""
+        def fill(text: str) -> str:
+            return re.sub(r"\{\{\s*(\w+)\s*\}\}", lambda m: str(variables.get(m.group(1), m.group(0))), text)
+        if isinstance(self.prompt, str):
+            return fill(self.prompt)
+        return [{**message, "content": fill(message["content"])} for message in self.prompt]
+
+
+class PromptRegistry:
+    """get_prompt() with a TTL cache, disk snapshot, stale-while-revalidate and version pinning."""
+
+    def __init__(self, langfuse, ttl: float = 60.0, snapshot_path: Optional[str] = ".prompt_cache.json"):
+        self.langfuse = langfuse
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self._prompts = {}
+        self._refreshing = {}  # key -> Thread
+        self._lock = threading.Lock()
+        self.stats = {"fresh": 0, "stale": 0, "fetched": 0, "refreshed": 0, "refresh_errors": 0, "snapshot_errors": 0}
+        self._load_snapshot()
+
+    @staticmethod
+    def _key(name: str, version: Optional[int], label: Optional[str]) -> str:
+        return f"{name}@{version}" if version is not None else f"{name}:{label or 'production'}"
+
+    def get(self, name: str, version: Optional[int] = None, label: Optional[str] = None,
+            fallback: Optional[CachedPrompt] = None) -> CachedPrompt:
+        """
+        Cached prompt for name (pinned `version`, else `label`, default production).
+        Only a prompt that has never been fetched or snapshotted blocks on the network;
+        if that fetch fails, `fallback` is returned when given.
+        """
+        key = self._key(name, version, label)
+        with self._lock:
+            cached = self._prompts.get(key)
+        if cached is not None:
+            if version is not None or time.time() - cached.fetched_at < self.ttl:
+                self.stats["fresh"] += 1
+            else:
+                self.stats["stale"] += 1
+                self._refresh_in_background(key, name, version, label)
+            return cached
+        try:
+            return self._fetch(key, name, version, label)
+        except Exception:
+            if fallback is None:
+                raise
+            return fallback
+
+    def _fetch(self, key: str, name: str, version: Optional[int], label: Optional[str]) -> CachedPrompt:
+        # cache_ttl_seconds=0 bypasses the SDK's own cache; this registry decides when to refetch
+        prompt = self.langfuse.get_prompt(name, version=version, label=label, cache_ttl_seconds=0)
+        cached = CachedPrompt(
+            name=name, version=getattr(prompt, "version", version), prompt=prompt.prompt,
+            config=dict(prompt.config or {}), fetched_at=time.time(),
+        )
+        with self._lock:
+            self._prompts[key] = cached
+        self.stats["fetched"] += 1
+        self._save_snapshot()
+        return cached
+
+    def _refresh_in_background(self, key: str, name: str, version: Optional[int], label: Optional[str]):
+        with self._lock:
+            if key in self._refreshing:
+                return  # one refresh per prompt at a time
+            thread = threading.Thread(target=self._refresh, args=(key, name, version, label), daemon=True)
+            self._refreshing[key] = thread
+        thread.start()
+
+    def _refresh(self, key: str, name: str, version: Optional[int], label: Optional[str]):
+        try:
+            self._fetch(key, name, version, label)
+            self.stats["refreshed"] += 1
+        except Exception:
+            # Keep serving the stale prompt; the next get() after the TTL tries again
+            self.stats["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def wait(self, timeout: float = 5.0):
+        """Wait for in-flight background refreshes, e.g. before a short-lived script exits."""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            threads = list(self._refreshing.values())
+        for thread in threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path) as f:
+                self._prompts = {key: CachedPrompt(**value) for key, value in json.load(f).items()}
+        except (OSError, ValueError, TypeError):
+            self._prompts = {}  # a corrupt snapshot only costs one fetch
+
+    def _save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            data = {key: asdict(prompt) for key, prompt in self._prompts.items()}
+        # Write then rename so a crash never leaves a half-written snapshot
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            # The snapshot only speeds up the next cold start; a full disk or read-only dir must not fail get()
+            self.stats["snapshot_errors"] += 1
+            logger.warning("Could not write prompt snapshot %s: %s", self.snapshot_path, e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def create_prompt_registry(langfuse) -> PromptRegistry:
+    """Build the registry from PROMPT_CACHE_TTL_SECONDS and PROMPT_CACHE_PATH (empty disables the snapshot)."""
+    return PromptRegistry(
+        langfuse,
+        ttl=float(os.getenv("PROMPT_CACHE_TTL_SECONDS", "60")),
+        snapshot_path=os.getenv("PROMPT_CACHE_PATH", ".prompt_cache.json") or None,
+    )
@@ -0,0 +1,94 @@
+"""
+Token-bucket rate limiting per user.
+InMemoryRateLimiter works for a single worker; SQLiteRateLimiter keeps the buckets in a local SQLite file
+so every uvicorn worker on the host enforces the same limit.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Union
+
+
+class InMemoryRateLimiter:
+    """Per-process token buckets: `rate_per_minute` refill, up to `burst` tokens."""
+
+    blocking = False  # a dict update under a lock, cheap enough to run on the event loop
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._buckets = {}  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> float:
+        """Take one token. Returns 0 when allowed, otherwise seconds until a token is available."""
+        now = time.time()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+
+class SQLiteRateLimiter:
+    """Token buckets shared by all worker processes through a SQLite file."""
+
+    blocking = True  # BEGIN IMMEDIATE can wait up to the busy timeout for another worker's lock
+
+    def __init__(self, rate_per_minute: float, burst: int, path: str = "rate_limit.db"):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.path = path
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode so we can issue BEGIN IMMEDIATE ourselves
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, key: str) -> float:
+        conn = self._conn()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front so two workers can't spend the same token
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM rate_limit WHERE key = ?", (key,)).fetchone()
+            tokens, updated_at = row if row else (self.burst, now)
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / self.rate
+            conn.execute("INSERT OR REPLACE INTO rate_limit VALUES (?, ?, ?)", (key, tokens, now))
+            conn.execute("COMMIT")
+            return retry_after
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def create_rate_limiter() -> Optional[Union[InMemoryRateLimiter, SQLiteRateLimiter]]:
+    """
+    Build the limiter from environment variables:
+    RATE_LIMIT_PER_MINUTE (0 disables), RATE_LIMIT_BURST, RATE_LIMIT_BACKEND=memory|sqlite, RATE_LIMIT_SQLITE_PATH.
+    """
+    rate = float(os.getenv("RATE_LIMIT_PER_MINUTE", "0"))
+    if rate <= 0:
+        return None
+    burst = int(os.getenv("RATE_LIMIT_BURST", str(max(int(rate // 6), 1))))
+    if os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "sqlite":
+        return SQLiteRateLimiter(rate, burst, os.getenv("RATE_LIMIT_SQLITE_PATH", "rate_limit.db"))
+    return InMemoryRateLimiter(rate, burst)
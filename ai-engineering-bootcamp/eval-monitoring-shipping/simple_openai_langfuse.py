@@ -1,51 +1,199 @@
 """
 Simple script to call OpenAI endpoint with Langfuse observability
 Uses Langfuse's OpenAI wrapper for automatic tracing
-Loads prompt from Langfuse Prompt Management
+Loads prompt from Langfuse Prompt Management (cached locally, see prompt_registry.py)
+
+Run:
+    python simple_openai_langfuse.py                                  # one question
+    python simple_openai_langfuse.py --input prompts.txt --output results.jsonl --concurrency 16
+    cat prompts.jsonl | python simple_openai_langfuse.py --input - > results.jsonl
+
+Batch input is one prompt per line, either plain text or JSON with a "prompt" (and optional "id") field.
+Results are written as JSONL in completion order; a throughput/token/latency summary goes to stderr.
 """
 
+import argparse
+import asyncio
+import json
+import math
 import os
+import random
+import sys
+import time
 from dotenv import load_dotenv
-from langfuse.openai import openai
+from langfuse.openai import AsyncOpenAI
 from langfuse import get_client
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from cassette import achat_completion
+from prompt_registry import create_prompt_registry
+
+DEFAULT_QUESTION = "What are the key characteristics of Baroque music?"
+
+# Errors worth retrying: rate limits and transient server/network failures
+RETRYABLE = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+def read_prompts(path: str) -> list:
+    """(id, prompt) pairs from a text or JSONL file, or stdin when path is '-'."""
+    prompts = []
+    with (sys.stdin if path == "-" else open(path)) as f:
+        for index, line in enumerate(line for line in f if line.strip()):
+            line = line.strip()
+            if line.startswith("{"):
+                row = json.loads(line)
+                prompts.append((str(row.get("id", index)), row["prompt"]))
+            else:
+                prompts.append((str(index), line))
+    return prompts
+
+
+def backoff_delay(attempt: int, error: Exception, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
+
+async def complete(client, request_id: str, question: str, request: dict, slots: asyncio.Semaphore, args) -> dict:
+    """One chat completion with retries; always returns a result row (errors included)."""
+    request = {**request, "messages": request["messages"] + [{"role": "user", "content": question}]}
+    async with slots:
+        start = time.perf_counter()
+        for attempt in range(args.max_retries + 1):
+            try:
+                # LLM_CASSETTE=record|replay|auto records or replays the call
+                result = await achat_completion(client.chat.completions.create, **request)
+                usage = result.usage
+                return {
+                    "id": request_id, "prompt": question, "response": result.choices[0].message.content,
+                    "latency": time.perf_counter() - start, "attempts": attempt + 1,
+                    "prompt_tokens": usage.prompt_tokens if usage else 0,
+                    "completion_tokens": usage.completion_tokens if usage else 0,
+                    "error": None,
+                }
+            except RETRYABLE as e:
+                if attempt == args.max_retries:
+                    error = e
+                    break
+                await asyncio.sleep(backoff_delay(attempt, e, args.backoff_base, args.backoff_max))
+            except Exception as e:
+                error = e
+                break
+    return {
+        "id": request_id, "prompt": question, "response": None,
+        "latency": time.perf_counter() - start, "attempts": attempt + 1,
+        "prompt_tokens": 0, "completion_tokens": 0, "error": f"{type(error).__name__}: {error}",
+    }
+
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+def print_summary(rows: list, elapsed: float):
+    ok = [row for row in rows if row["error"] is None]
+    latencies = [row["latency"] for row in ok]
+    prompt_tokens = sum(row["prompt_tokens"] for row in rows)
+    completion_tokens = sum(row["completion_tokens"] for row in rows)
+    out = sys.stderr
+    print("=" * 60, file=out)
+    print(f"{len(ok)} ok / {len(rows) - len(ok)} failed in {elapsed:.1f}s "
+          f"({len(rows) / max(elapsed, 1e-9):.1f} req/s)", file=out)
+    print(f"retries: {sum(row['attempts'] - 1 for row in rows)}", file=out)
+    print(f"tokens: {prompt_tokens} prompt + {completion_tokens} completion "
+          f"({(prompt_tokens + completion_tokens) / max(elapsed, 1e-9):.0f} tokens/s)", file=out)
+    print(f"latency: p50 {percentile(latencies, 50):.2f}s  p95 {percentile(latencies, 95):.2f}s  "
+          f"p99 {percentile(latencies, 99):.2f}s  max {max(latencies, default=0):.2f}s", file=out)
+    print("=" * 60, file=out)
+
+
+async def run_batch(client, prompts: list, request: dict, args) -> list:
+    """Run every prompt through the bounded pool and write each result as soon as it completes."""
+    slots = asyncio.Semaphore(args.concurrency)
+    tasks = [asyncio.create_task(complete(client, request_id, question, request, slots, args))
+             for request_id, question in prompts]
+    rows = []
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for task in asyncio.as_completed(tasks):
+            row = await task
+            rows.append(row)
+            out.write(json.dumps(row) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask OpenAI one question, or a batch of them, with Langfuse tracing")
+    parser.add_argument("--input", help="Prompts file (text or JSONL, '-' for stdin); omit to ask the single demo question")
+    parser.add_argument("--output", default="-", help="JSONL results path (default stdout)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per request on rate limits and transient errors")
+    parser.add_argument("--backoff-base", type=float, default=0.5, help="First retry backoff ceiling in seconds")
+    parser.add_argument("--backoff-max", type=float, default=30.0, help="Maximum backoff in seconds")
+    args = parser.parse_args()
+    if args.max_retries < 0:
+        parser.error("--max-retries must be 0 or more")
+
+    # Load environment variables
+    load_dotenv()
 
-# Load environment variables
-load_dotenv()
+    # Initialize Langfuse client
+    langfuse = get_client()
 
-# Initialize Langfuse client
-langfuse = get_client()
+    # Load prompt from Langfuse Prompt Management through the local cache: served from the on-disk snapshot
+    # when available and refreshed in the background once older than PROMPT_CACHE_TTL_SECONDS
+    prompts = create_prompt_registry(langfuse)
+    pinned_version = os.getenv("LANGFUSE_PROMPT_VERSION")
+    prompt = prompts.get(
+        "research_assistant_system_prompt",
+        version=int(pinned_version) if pinned_version else None,
+        label=os.getenv("LANGFUSE_PROMPT_LABEL"),
+    )
 
-# Set OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
+    # Get prompt text and config
+    prompt_text = prompt.compile()
+    model = prompt.config.get("model", "gpt-3.5-turbo") if prompt.config else "gpt-3.5-turbo"
+    temperature = prompt.config.get("temperature", 0.7) if prompt.config else 0.7
+    request = {"model": model, "messages": [{"role": "system", "content": prompt_text}], "temperature": temperature}
 
-# Load prompt from Langfuse Prompt Management
-prompt = langfuse.get_prompt("research_assistant_system_prompt")
+    # Langfuse's AsyncOpenAI wrapper traces every call; retries are ours, with jitter, so the SDK's are off
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
 
-# Get prompt text and config
-prompt_text = prompt.prompt
-model = prompt.config.get("model", "gpt-3.5-turbo") if prompt.config else "gpt-3.5-turbo"
-temperature = prompt.config.get("temperature", 0.7) if prompt.config else 0.7
+    if args.input:
+        batch = read_prompts(args.input)
+        start = time.perf_counter()
+        rows = asyncio.run(run_batch(client, batch, request, args))
+        print_summary(rows, time.perf_counter() - start)
+    else:
+        row = asyncio.run(complete(client, "0", DEFAULT_QUESTION, request, asyncio.Semaphore(1), args))
 
-# Call OpenAI with automatic tracing
-result = openai.chat.completions.create(
-    model=model,
-    messages=[
-        {"role": "system", "content": prompt_text},
-        {"role": "user", "content": "What are the key characteristics of Baroque music?"}
-    ],
-    temperature=temperature,
-)
+        # Print result
+        print("=" * 60)
+        print("OpenAI Response:")
+        print("=" * 60)
+        print(row["response"] if row["error"] is None else f"Error: {row['error']}")
+        print("=" * 60)
 
-# Print result
-print("=" * 60)
-print("OpenAI Response:")
-print("=" * 60)
-print(result.choices[0].message.content)
-print("=" * 60)
+    # Flush to send traces immediately, and let a background prompt refresh finish updating the snapshot
+    langfuse.flush()
+    prompts.wait()
 
-# Flush to send trace immediately
-langfuse.flush()
+    log = sys.stderr if args.input else sys.stdout  # keep stdout clean for JSONL results
+    print("\n✅ Trace sent to Langfuse! Check dashboard in 2-5 seconds.", file=log)
+    print("   Visit: https://cloud.langfuse.com", file=log)
 
-print("\n✅ Trace sent to Langfuse! Check dashboard in 2-5 seconds.")
-print("   Visit: https://cloud.langfuse.com")
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Background telemetry exporter - keeps Langfuse calls off the request hot path.
+Request handlers push scores into a bounded in-process queue;
+a daemon thread drains it in batches (flush at `batch_size` items or every `flush_interval` seconds).
+When the queue is full new events are dropped and counted instead of blocking the request.
+
+Benchmark the enqueue overhead without a Langfuse server:
+    python telemetry.py
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+
+class LangfuseSink:
+    """Sends batched events through the Langfuse client."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def export(self, batch: list):
+        for kind, payload in batch:
+            if kind == "score":
+                self.client.score(**payload)
+
+    def flush(self):
+        self.client.flush()
+
+
+class FakeSink:
+    """Local stand-in for Langfuse: keeps events in memory and simulates per-batch network latency."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.events = []
+        self.batches = 0
+
+    def export(self, batch: list):
+        if self.latency:
+            time.sleep(self.latency)
+        self.events.extend(batch)
+        self.batches += 1
+
+    def flush(self):
+        pass
+
+
+class TelemetryExporter:
+    """Bounded queue + background batch exporter."""
+
+    def __init__(self, sink, max_queue: int = 10_000, batch_size: int = 100, flush_interval: float = 1.0):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.counters = {"enqueued": 0, "exported": 0, "dropped": 0, "batches": 0, "export_errors": 0}
+
+    def score(self, **payload):
+        """Queue a Langfuse score (same kwargs as `Langfuse.score`)."""
+        self._enqueue("score", payload)
+
+    def _enqueue(self, kind: str, payload: dict):
+        self.start()
+        try:
+            self._queue.put_nowait((kind, payload))
+            self.counters["enqueued"] += 1
+        except queue.Full:
+            self.counters["dropped"] += 1
+
+    def start(self):
+        """Start the background thread (idempotent; also called lazily on first event)."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="telemetry-exporter", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Flush everything still queued and stop the background thread."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+        while batch := self._drain(block=False):
+            self._export(batch)
+        self.sink.flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._drain(block=True)
+            if batch:
+                self._export(batch)
+
+    def _drain(self, block: bool) -> list:
+        """Collect up to batch_size events, waiting at most flush_interval for the batch to fill."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if block and remaining > 0:
+                    batch.append(self._queue.get(timeout=min(remaining, 0.1)))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                if not block or remaining <= 0 or self._stopping.is_set():
+                    break
+        return batch
+
+    def _export(self, batch: list):
+        if not batch:
+            return
+        try:
+            self.sink.export(batch)
+            self.counters["exported"] += len(batch)
+            self.counters["batches"] += 1
+        except Exception:
+            # Observability must never take the service down; count and move on
+            self.counters["export_errors"] += 1
+
+    def stats(self) -> dict:
+        return {**self.counters, "queued": self._queue.qsize(), "sink": type(self.sink).__name__}
+
+
+def create_exporter(langfuse_client) -> Optional[TelemetryExporter]:
+    """
+    Build the exporter from environment variables:
+    TELEMETRY_EXPORTER=langfuse|fake|off, TELEMETRY_MAX_QUEUE, TELEMETRY_BATCH_SIZE, TELEMETRY_FLUSH_INTERVAL.
+    """
+    kind = os.getenv("TELEMETRY_EXPORTER", "langfuse").lower()
+    if kind == "fake":
+        sink = FakeSink(latency=float(os.getenv("TELEMETRY_FAKE_LATENCY", "0.05")))
+    elif kind == "langfuse" and langfuse_client:
+        sink = LangfuseSink(langfuse_client)
+    else:
+        return None
+
+    return TelemetryExporter(
+        sink,
+        max_queue=int(os.getenv("TELEMETRY_MAX_QUEUE", "10000")),
+        batch_size=int(os.getenv("TELEMETRY_BATCH_SIZE", "100")),
+        flush_interval=float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "1.0")),
+    )
+
+
+if __name__ == "__main__":
+    # Compare per-request overhead: calling the sink inline vs queueing for the background exporter
+    requests_count, scores_per_request, sink_latency = 200, 2, 0.005
+
+    sink = FakeSink(latency=sink_latency)
+    start = time.perf_counter()
+    for i in range(requests_count):
+        for _ in range(scores_per_request):
+            sink.export([("score", {"trace_id": str(i), "name": "relevance", "value": 1.0})])
+    inline = (time.perf_counter() - start) / requests_count
+
+    exporter = TelemetryExporter(FakeSink(latency=sink_latency), batch_size=100, flush_interval=0.5)
+    start = time.perf_counter()
+    for i in range(requests_count):
+        for _ in range(scores_per_request):
+            exporter.score(trace_id=str(i), name="relevance", value=1.0)
+    queued = (time.perf_counter() - start) / requests_count
+    exporter.stop()
+
+    print(f"Inline scoring:  {inline * 1000:.3f} ms per request")
+    print(f"Queued scoring:  {queued * 1000:.3f} ms per request")
+    print(f"Exporter stats:  {exporter.stats()}")
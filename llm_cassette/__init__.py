@@ -0,0 +1,135 @@
+"""
+Record/replay ("cassette") layer for LLM calls, shared by the projects in this repository.
+Request/response pairs are stored in an append-only JSONL file keyed by a hash of the request,
+so tests, evals, benchmarks and demos can replay real model output offline, deterministically and fast.
+
+Configured with environment variables:
+    LLM_CASSETTE=off|record|replay|auto   auto replays hits and records misses (default off)
+    LLM_CASSETTE_PATH=cassettes/llm.jsonl
+    LLM_CASSETTE_LATENCY_MS=0             simulated latency on replay; "recorded" replays the original latency
+
+This package holds the store, the request keys and the OpenAI SDK adapter. Framework adapters turn a request into
+a key and a response into JSON:
+    llm_cassette.langchain.wrap_chat_model(llm, model)   LangChain chat models - tool calls and usage are kept
+    chat_completion(create, **request)                   OpenAI SDK chat.completions.create
+    achat_completion(create, **request)                  the same for AsyncOpenAI clients
+ADK projects add a BaseLlm adapter on top of open_cassette() (see adk-multi-agent-systems/cassette.py).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Optional
+
+
+class CassetteMiss(KeyError):
+    """Raised when a request has no recording and recording is not possible."""
+
+
+class CassetteStore:
+    """Recorded responses in memory, backed by an append-only JSONL file."""
+
+    def __init__(self, path: str, mode: str = "auto", latency_ms: str = "0"):
+        self.path = path
+        self.mode = mode
+        self.recorded_latency = latency_ms == "recorded"
+        self.latency = 0.0 if self.recorded_latency else float(latency_ms) / 1000
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry  # later lines win, so re-recording overrides
+
+    @staticmethod
+    def key(request: dict) -> str:
+        payload = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def lookup(self, key: str, can_record: bool = True) -> Optional[dict]:
+        """Recorded entry for key, or None when the caller should make the live call and save() it."""
+        entry = None if self.mode == "record" else self._entries.get(key)
+        with self._lock:
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+        if self.mode == "replay" or not can_record:
+            raise CassetteMiss(f"No recording for request {key} in {self.path}")
+        return None
+
+    def delay(self, entry: dict) -> float:
+        """Seconds to wait before returning a replayed response."""
+        return entry.get("latency", 0.0) if self.recorded_latency else self.latency
+
+    def save(self, key: str, response: Any, latency: float):
+        entry = {"key": key, "latency": round(latency, 4), "response": response}
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._entries[key] = entry
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line)
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "path": self.path, "entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+@lru_cache(maxsize=None)
+def _open(path: str, mode: str, latency_ms: str) -> CassetteStore:
+    return CassetteStore(path, mode, latency_ms)
+
+
+def open_cassette() -> Optional[CassetteStore]:
+    """The process-wide cassette configured by LLM_CASSETTE*, or None when disabled."""
+    mode = os.getenv("LLM_CASSETTE", "off").lower()
+    if mode == "off":
+        return None
+    if mode not in ("record", "replay", "auto"):
+        raise ValueError(f"LLM_CASSETTE must be off, record, replay or auto, got {mode!r}")
+    return _open(os.getenv("LLM_CASSETTE_PATH", "cassettes/llm.jsonl"), mode, os.getenv("LLM_CASSETTE_LATENCY_MS", "0"))
+
+
+# --- OpenAI SDK ---
+
+def chat_completion(create, **request):
+    """Call `create(**request)` (e.g. openai.chat.completions.create) through the cassette."""
+    store = open_cassette()
+    if store is None:
+        return create(**request)
+    from openai.types.chat import ChatCompletion
+
+    key = store.key(request)
+    entry = store.lookup(key)
+    if entry is not None:
+        time.sleep(store.delay(entry))
+        return ChatCompletion.model_validate(entry["response"])
+    start = time.perf_counter()
+    result = create(**request)
+    store.save(key, result.model_dump(mode="json"), time.perf_counter() - start)
+    return result
+
+
+async def achat_completion(create, **request):
+    """Async version of chat_completion for AsyncOpenAI clients."""
+    store = open_cassette()
+    if store is None:
+        return await create(**request)
+    from openai.types.chat import ChatCompletion
+
+    key = store.key(request)
+    entry = store.lookup(key)
+    if entry is not None:
+        await asyncio.sleep(store.delay(entry))
+        return ChatCompletion.model_validate(entry["response"])
+    start = time.perf_counter()
+    result = await create(**request)
+    store.save(key, result.model_dump(mode="json"), time.perf_counter() - start)
+    return result
@@ -0,0 +1,98 @@
+"""
+LangChain adapter for the cassette: CassetteChatModel replays recorded AIMessages (tool calls and usage included)
+and records misses from the wrapped chat model.
+"""
+
+import asyncio
+import time
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from llm_cassette import open_cassette
+
+
+def _fingerprint(message) -> dict:
+    """Request-relevant parts of a message; ids are left out because they differ between runs."""
+    return {
+        "type": message.type,
+        "content": message.content,
+        "tool_calls": [{"name": c["name"], "args": c["args"]} for c in getattr(message, "tool_calls", None) or []],
+    }
+
+
+class CassetteChatModel(BaseChatModel):
+    """Wraps a LangChain chat model; replays recorded AIMessages and records misses from `inner`."""
+
+    inner: Optional[Any] = None  # live model (or tool-bound runnable); None means replay only
+    store: Any
+    model_name: str = ""
+    tools: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def bind_tools(self, tools, **kwargs):
+        inner = self.inner.bind_tools(tools, **kwargs) if self.inner is not None else None
+        return self.model_copy(update={"inner": inner, "tools": [convert_to_openai_tool(t) for t in tools]})
+
+    def _key(self, messages, stop, kwargs) -> str:
+        return self.store.key({
+            "model": self.model_name, "messages": [_fingerprint(m) for m in messages],
+            "tools": self.tools, "stop": stop, "kwargs": kwargs,
+        })
+
+    def _replay(self, entry) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=messages_from_dict([entry["response"]])[0])])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        entry = self.store.lookup(key, can_record=self.inner is not None)
+        if entry is not None:
+            time.sleep(self.store.delay(entry))
+            return self._replay(entry)
+        start = time.perf_counter()
+        message = self.inner.invoke(messages, stop=stop, **kwargs)
+        self.store.save(key, message_to_dict(message), time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        entry = self.store.lookup(key, can_record=self.inner is not None)
+        if entry is not None:
+            await asyncio.sleep(self.store.delay(entry))
+            return self._replay(entry)
+        start = time.perf_counter()
+        message = await self.inner.ainvoke(messages, stop=stop, **kwargs)
+        self.store.save(key, message_to_dict(message), time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        """Replays arrive as a single chunk; misses stream live and are saved once complete."""
+        key = self._key(messages, stop, kwargs)
+        entry = self.store.lookup(key, can_record=self.inner is not None)
+        if entry is not None:
+            await asyncio.sleep(self.store.delay(entry))
+            message = messages_from_dict([entry["response"]])[0]
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=message.content, tool_calls=message.tool_calls, usage_metadata=message.usage_metadata,
+            ))
+            return
+        start, full = time.perf_counter(), None
+        async for chunk in self.inner.astream(messages, stop=stop, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield ChatGenerationChunk(message=chunk)
+        if full is not None:
+            self.store.save(key, message_to_dict(full), time.perf_counter() - start)
+
+
+def wrap_chat_model(llm, model: str):
+    """Put the cassette in front of a LangChain chat model; returns llm unchanged when LLM_CASSETTE is off."""
+    store = open_cassette()
+    if store is None:
+        return llm
+    return CassetteChatModel(inner=llm, store=store, model_name=model)
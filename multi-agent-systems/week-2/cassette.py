@@ -0,0 +1,19 @@
+"""
+Record/replay ("cassette") for the ReAct agent's LLM calls.
+The store, request keys and LangChain adapter live in the shared llm_cassette package at the repository root; this
+module puts it on the import path. Settings (LLM_CASSETTE, LLM_CASSETTE_PATH, LLM_CASSETTE_LATENCY_MS) are
+described in llm_cassette/__init__.py.
+
+wrap_chat_model(llm, model) puts the cassette in front of the ReAct agent's ChatOpenAI;
+tool calls from llm.bind_tools(...) are recorded and replayed too.
+"""
+
+import os
+import sys
+
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from llm_cassette import CassetteMiss, open_cassette  # noqa: E402
+from llm_cassette.langchain import CassetteChatModel, wrap_chat_model  # noqa: E402
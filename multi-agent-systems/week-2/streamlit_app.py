@@ -25,6 +25,7 @@ from langchain_core.messages import AIMessage, ToolMessage
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from datetime import datetime
+from cassette import wrap_chat_model
 
 # Import Tavily if available
 try:
@@ -117,13 +118,10 @@ def get_current_date() -> str:
 
 tools = [tavily_search, get_todays_events, get_current_date]
 
-# Initialize LLM
-if api_key:
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    llm_with_tools = llm.bind_tools(tools)
-else:
-    llm = None
-    llm_with_tools = None
+# Initialize LLM (LLM_CASSETTE=record|replay|auto records or replays calls, see cassette.py)
+llm = ChatOpenAI(model="gpt-4o-mini", temperature=0) if api_key else None
+llm = wrap_chat_model(llm, "gpt-4o-mini")
+llm_with_tools = llm.bind_tools(tools) if llm else None
 
 # Define state
 class AgentState(TypedDict):